@@ -5,17 +5,57 @@ This module provides the framework for building autonomous agents
 that can analyze IT environments and take corrective actions using llamastack.
 """
 
-from .agent import AutonomousAgent
+from .agent import AutonomousAgent, AsyncAutonomousAgent
+from .agent_cache import AgentCache
+from .sessions import SessionPool
+from .streaming import (
+    TurnStreamDecoder,
+    TextDelta,
+    ToolCallStarted,
+    ToolCallFinished,
+    TurnCompleted,
+)
 from .tools import ToolRegistry, ITTool, create_tools
-from .environment import SimulatedEnvironment
-from .memory import AgentMemory
+from .tool_cache import ToolResultCache
+from .metrics import ToolHook, ToolMetrics
+from .environment import SimulatedEnvironment, EnvironmentSnapshot
+from .vectorized_environment import VectorizedEnvironment
+from .action_log import ActionLog
+from .scenario import Scenario, ScenarioEvent, EpisodeRecorder, replay_episode
+from .memory import AgentMemory, iter_journal
+from .sqlite_memory import SQLiteAgentMemory
+from .similarity import SimilarityIndex, LexicalIndex, EmbeddingIndex, HashingEmbedder
 
 __all__ = [
     "AutonomousAgent",
+    "AsyncAutonomousAgent",
+    "AgentCache",
+    "SessionPool",
+    "TurnStreamDecoder",
+    "TextDelta",
+    "ToolCallStarted",
+    "ToolCallFinished",
+    "TurnCompleted",
     "ToolRegistry",
     "ITTool",
     "create_tools",
+    "ToolResultCache",
+    "ToolHook",
+    "ToolMetrics",
     "SimulatedEnvironment",
+    "EnvironmentSnapshot",
+    "VectorizedEnvironment",
+    "ActionLog",
+    "Scenario",
+    "ScenarioEvent",
+    "EpisodeRecorder",
+    "replay_episode",
     "AgentMemory",
+    "iter_journal",
+    "SQLiteAgentMemory",
+    "SimilarityIndex",
+    "LexicalIndex",
+    "EmbeddingIndex",
+    "HashingEmbedder",
 ]
 
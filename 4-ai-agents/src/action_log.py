@@ -0,0 +1,216 @@
+"""
+Environment Action Log
+
+This module provides the audit log used by the simulated environments.
+The log is a ring buffer with optional capacity, indexed by service name
+and action type, and can spill evicted entries to a JSONL file so long
+simulation runs keep a full history on disk with bounded memory.
+"""
+
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from collections import deque
+from itertools import islice
+import json
+import os
+import threading
+
+
+class ActionLog:
+    """
+    Bounded, indexed log of environment actions.
+    
+    Entries are dictionaries with "timestamp", "action" and "result" keys,
+    as returned by get_action_log(). Each entry gets a sequence number;
+    with a capacity, entry seq lives in slot seq % capacity and the oldest
+    entry is evicted (and spilled, if configured) when the buffer is full.
+    The service and action indexes hold sequence numbers in ascending order,
+    so evicting an entry only pops the left end of two index deques.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None, spill_path: Optional[str] = None):
+        """
+        Initialize action log.
+        
+        Args:
+            capacity: Maximum number of entries kept in memory (None = unbounded)
+            spill_path: Optional JSONL file that evicted entries are appended to
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._spill_file = None
+        self._lock = threading.Lock()  # Tools may log from several threads
+        self._reset()
+    
+    def _reset(self):
+        """Forget all in-memory entries"""
+        self._slots: List[Dict[str, Any]] = []
+        self._first_seq = 0
+        self._next_seq = 0
+        self._by_service: Dict[str, Deque[int]] = {}
+        self._by_action: Dict[str, Deque[int]] = {}
+    
+    def _slot(self, seq: int) -> int:
+        """Position of entry seq in the slot list"""
+        return seq % self.capacity if self.capacity else seq
+    
+    def append(self, entry: Dict[str, Any]):
+        """
+        Add an entry, evicting the oldest one if the log is full.
+        
+        Args:
+            entry: Log entry with "timestamp", "action" and "result" keys
+        """
+        with self._lock:
+            if self.capacity and len(self) == self.capacity:
+                self._evict()
+            
+            seq = self._next_seq
+            self._next_seq += 1
+            if self._slot(seq) == len(self._slots):
+                self._slots.append(entry)
+            else:
+                self._slots[self._slot(seq)] = entry
+            
+            service_name = entry.get("result", {}).get("service_name")
+            if service_name is not None:
+                self._by_service.setdefault(service_name, deque()).append(seq)
+            self._by_action.setdefault(entry["action"], deque()).append(seq)
+    
+    def _evict(self):
+        """Drop the oldest entry from memory (spilling it if configured)"""
+        seq = self._first_seq
+        entry = self._slots[self._slot(seq)]
+        self._first_seq += 1
+        
+        if self.spill_path:
+            self._spill(entry)
+        
+        service_name = entry.get("result", {}).get("service_name")
+        if service_name is not None:
+            self._drop_from_index(self._by_service, service_name, seq)
+        self._drop_from_index(self._by_action, entry["action"], seq)
+    
+    @staticmethod
+    def _drop_from_index(index: Dict[str, Deque[int]], key: str, seq: int):
+        """Remove the oldest sequence number from an index entry"""
+        seqs = index[key]
+        if seqs and seqs[0] == seq:
+            seqs.popleft()
+        if not seqs:
+            del index[key]
+    
+    def _spill(self, entry: Dict[str, Any]):
+        """Append an evicted entry to the spill file"""
+        if self._spill_file is None:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._spill_file = open(self.spill_path, 'a', encoding='utf-8')
+        self._spill_file.write(json.dumps(entry, default=str) + "\n")
+    
+    def get(
+        self,
+        limit: Optional[int] = None,
+        service_name: Optional[str] = None,
+        action: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get in-memory entries, oldest first.
+        
+        Args:
+            limit: Maximum number of (most recent) entries to return
+            service_name: Only return entries for this service
+            action: Only return entries of this action type
+            
+        Returns:
+            List of log entries
+        """
+        if service_name is None and action is None:
+            seqs = range(self._first_seq, self._next_seq)
+            if limit:
+                seqs = seqs[-limit:]
+            return [self._slots[self._slot(seq)] for seq in seqs]
+        
+        if service_name is not None and action is not None:
+            service_seqs = self._by_service.get(service_name, ())
+            action_seqs = self._by_action.get(action, ())
+            # Scan the shorter index and check the other condition per entry
+            if len(service_seqs) <= len(action_seqs):
+                seqs = service_seqs
+            else:
+                seqs = action_seqs
+            candidates = (self._slots[self._slot(seq)] for seq in reversed(seqs))
+            matches = []
+            for entry in candidates:
+                if entry["action"] == action and entry["result"].get("service_name") == service_name:
+                    matches.append(entry)
+                    if limit and len(matches) == limit:
+                        break
+            matches.reverse()
+            return matches
+        
+        if service_name is not None:
+            seqs = self._by_service.get(service_name, ())
+        else:
+            seqs = self._by_action.get(action, ())
+        if limit:
+            seqs = list(islice(reversed(seqs), limit))[::-1]
+        return [self._slots[self._slot(seq)] for seq in seqs]
+    
+    def count(self, service_name: Optional[str] = None, action: Optional[str] = None) -> int:
+        """
+        Count in-memory entries for a service or action type.
+        
+        Args:
+            service_name: Only count entries for this service
+            action: Only count entries of this action type
+            
+        Returns:
+            Number of matching entries
+        """
+        if service_name is None and action is None:
+            return len(self)
+        if service_name is not None and action is not None:
+            return len(self.get(service_name=service_name, action=action))
+        if service_name is not None:
+            return len(self._by_service.get(service_name, ()))
+        return len(self._by_action.get(action, ()))
+    
+    def iter_history(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the full history: spilled entries, then in-memory ones.
+        
+        Yields:
+            Log entries, oldest first
+        """
+        if self.spill_path and os.path.exists(self.spill_path):
+            if self._spill_file is not None:
+                self._spill_file.flush()
+            with open(self.spill_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        yield from self
+    
+    def clear(self):
+        """Forget all in-memory entries (the spill file is kept)"""
+        with self._lock:
+            self._reset()
+    
+    def close(self):
+        """Close the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.get())
+    
+    def __getitem__(self, index):
+        return self.get()[index]
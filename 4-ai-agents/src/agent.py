@@ -5,13 +5,13 @@ This module provides the core agent framework that combines
 reasoning (LLM) with action-taking (tools) using llamastack.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterator, Sequence, Tuple, Union
+import asyncio
 import os
-import time
 
 # Import llamastack SDK
 try:
-    from llama_stack_client import LlamaStackClient
+    from llama_stack_client import AsyncLlamaStackClient, LlamaStackClient
 except ImportError:
     raise ImportError(
         "llama_stack_client is required. Install it with: pip install llama-stack-client"
@@ -21,17 +21,22 @@ except ImportError:
 try:
     from .tools import ToolRegistry
     from .memory import AgentMemory
+    from .agent_cache import AgentCache, DEFAULT_AGENT_CACHE, agent_cache_key
+    from .sessions import SessionPool
+    from .streaming import AgentEvent, TurnCompleted, TurnStreamDecoder
 except ImportError:
     from tools import ToolRegistry
     from memory import AgentMemory
+    from agent_cache import AgentCache, DEFAULT_AGENT_CACHE, agent_cache_key
+    from sessions import SessionPool
+    from streaming import AgentEvent, TurnCompleted, TurnStreamDecoder
 
 
-class AutonomousAgent:
+class _AgentBase:
     """
-    Autonomous agent that can reason about IT operations and take actions.
-    
-    The agent uses llamastack for LLM reasoning and a set of tools for actions.
-    It follows a ReAct pattern: Reasoning + Acting.
+    Configuration, caching and memory helpers shared by AutonomousAgent and
+    AsyncAutonomousAgent. Subclasses provide the llamastack client and the
+    (sync or async) entry points.
     """
     
     # Default agent instructions
@@ -47,6 +52,162 @@ When analyzing IT services:
 Always be careful and thoughtful. Only take actions that are necessary and safe.
 If you're unsure about an action, explain your reasoning."""
     
+    # Task used by analyze_environment()
+    ANALYZE_TASK = "Analyze the current state of all IT services. Check each service and identify any problems or issues that need attention."
+    
+    def _init_agent_config(
+        self,
+        model: str,
+        instructions: Optional[str],
+        cache_agent: bool,
+        agent_cache: Optional[AgentCache]
+    ):
+        """Build the agent configuration and its registration cache key."""
+        self.model = model
+        self.instructions = instructions or self.DEFAULT_INSTRUCTIONS
+        self.agent_config = {
+            "model": self.model,
+            "instructions": self.instructions,
+            "tools": self.tool_registry.get_tools_for_llamastack()
+        }
+        self.agent_cache = None
+        if cache_agent:
+            self.agent_cache = agent_cache if agent_cache is not None else DEFAULT_AGENT_CACHE
+        self._agent_cache_key = agent_cache_key(
+            self.llamastack_url, self.agent_config, tools_hash=self.tool_registry.schema_hash
+        )
+        self._agent_from_cache = False
+        self.agent_id: Optional[str] = None
+    
+    def _use_cached_agent(self) -> bool:
+        """Adopt a cached agent_id for this configuration, if there is one."""
+        if self.agent_cache is None:
+            return False
+        agent_id = self.agent_cache.get(self._agent_cache_key)
+        if not agent_id:
+            return False
+        
+        self.agent_id = agent_id
+        self._agent_from_cache = True
+        if self.verbose:
+            print(f"♻️  Reusing registered agent with model: {self.model}")
+            print(f"   Agent ID: {self.agent_id}")
+        return True
+    
+    def _agent_registered(self, agent_id: str):
+        """Record a newly registered agent_id (and cache it)."""
+        if self.agent_id is not None and self.agent_id != agent_id:
+            # Sessions of the previous agent died with it
+            self.session_pool.forget_all()
+        self.agent_id = agent_id
+        self._agent_from_cache = False
+        if self.agent_cache is not None:
+            self.agent_cache.put(self._agent_cache_key, agent_id)
+        
+        if self.verbose:
+            print(f"✅ Initialized agent with model: {self.model}")
+            print(f"   Agent ID: {self.agent_id}")
+    
+    def _forget_cached_agent(self) -> bool:
+        """
+        Drop a cached agent_id that the server no longer knows.
+        
+        Returns:
+            True if the agent came from the cache (so registering again may help)
+        """
+        if not self._agent_from_cache:
+            return False
+        self.agent_cache.invalidate(self._agent_cache_key)
+        self._agent_from_cache = False
+        return True
+    
+    def _check_url(self):
+        """Raise ConnectionError if the llamastack URL is not usable."""
+        # Check if llamastack_url is valid (handle both string and URL object)
+        url_str = str(self.llamastack_url) if self.llamastack_url else ""
+        if not url_str or not url_str.startswith("http"):
+            raise ConnectionError(
+                "LlamaStack URL is not configured. Please set LLAMA_STACK_URL environment variable."
+            )
+    
+    def _build_messages(self, task: str, context: Optional[str] = None) -> List[Dict[str, str]]:
+        """Build the user message list for a turn."""
+        input_text = f"Context: {context}\n\nTask: {task}" if context else task
+        return [{"role": "user", "content": input_text}]
+    
+    def _remember_execution(self, task: str, context: Optional[str], result: Dict[str, Any]):
+        """Store the outcome of an agent execution in memory."""
+        if self.memory:
+            self.memory.remember_action(
+                action_type="agent_execution",
+                action_params={"task": task, "context": context},
+                result=result,
+                success=result.get("success", False),
+                context=context or ""
+            )
+    
+    def _remediation_task(self, issue_description: str) -> Tuple[str, Optional[str]]:
+        """Build the remediation task and memory-derived context for an issue."""
+        context = None
+        if self.memory:
+            similar_problems = self.memory.get_similar_problems(issue_description, limit=3)
+            if similar_problems:
+                context = "Similar problems solved before:\n"
+                context += "\n".join(
+                    f"- {p.problem_description}: {'Solved' if p.success else 'Failed'}"
+                    for p in similar_problems
+                )
+        
+        task = f"Remediate the following issue: {issue_description}"
+        return task, context
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Get statistics about agent's memory."""
+        if not self.memory:
+            return {"error": "Memory not enabled"}
+        
+        return {
+            "action_statistics": self.memory.get_action_statistics(),
+            "total_actions": self.memory.count_actions(),
+            "total_problems_solved": self.memory.count_solved_problems(),
+            "recent_actions": [
+                {
+                    "type": a.action_type,
+                    "success": a.success,
+                    "timestamp": a.timestamp
+                }
+                for a in self.memory.get_recent_actions(limit=5)
+            ]
+        }
+    
+    def _turn_result(self, session_id: str, decoder: TurnStreamDecoder) -> Dict[str, Any]:
+        """Build the result dictionary for a completed turn."""
+        return {
+            "success": True,
+            "result": decoder.text.strip() or "Task completed (no output received)",
+            "session_id": session_id,
+            "turn_id": decoder.turn_id,
+            "tool_calls": decoder.tool_calls
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the result dictionary for a failed turn."""
+        return {
+            "success": False,
+            "error": str(error),
+            "result": None
+        }
+
+
+
+class AutonomousAgent(_AgentBase):
+    """
+    Autonomous agent that can reason about IT operations and take actions.
+    
+    The agent uses llamastack for LLM reasoning and a set of tools for actions.
+    It follows a ReAct pattern: Reasoning + Acting.
+    """
+    
     def __init__(
         self,
         tool_registry: ToolRegistry,
@@ -54,7 +215,11 @@ If you're unsure about an action, explain your reasoning."""
         llamastack_url: Optional[str] = None,
         model: str = os.getenv("LLAMA_MODEL", "openai/vllm-inference/llama-32-3b-instruct"),
         instructions: Optional[str] = None,
-        verbose: bool = True
+        verbose: bool = True,
+        session_pool_size: int = 0,
+        session_idle_ttl: Optional[float] = 300.0,
+        cache_agent: bool = True,
+        agent_cache: Optional[AgentCache] = None
     ):
         """
         Initialize autonomous agent.
@@ -66,36 +231,28 @@ If you're unsure about an action, explain your reasoning."""
             model: Model identifier (default: openai/vllm-inference/llama-32-3b-instruct)
             instructions: Custom agent instructions (uses default if not provided)
             verbose: Whether to print detailed execution logs
+            session_pool_size: Idle sessions kept for reuse across runs (0 = new session per run)
+            session_idle_ttl: Seconds an idle session is kept before it is deleted
+            cache_agent: Reuse an agent already registered with the same configuration
+            agent_cache: Cache of registered agents (default: shared process-wide cache)
         """
         self.tool_registry = tool_registry
         self.memory = memory or AgentMemory()
         self.verbose = verbose
+        self.session_pool = SessionPool(max_size=session_pool_size, idle_ttl=session_idle_ttl)
         
         # Initialize llamastack client
         self.llamastack_url = llamastack_url or os.getenv("LLAMA_STACK_URL", "http://localhost:8321")
         self.client = LlamaStackClient(base_url=self.llamastack_url)
         
-        # Verify connection
-        self._verify_connection()
-        
-        # Get tools and instructions
-        tools = self.tool_registry.get_tools_for_llamastack()
-        instructions = instructions or self.DEFAULT_INSTRUCTIONS
-        
-        # Create agent via API to get agent_id
-        agent_response = self.client.alpha.agents.create(
-            agent_config={
-                "model": model,
-                "instructions": instructions,
-                "tools": tools
-            }
-        )
+        self._init_agent_config(model, instructions, cache_agent, agent_cache)
         
-        self.agent_id = agent_response.agent_id
-        
-        if self.verbose:
-            print(f"✅ Initialized agent with model: {model}")
-            print(f"   Agent ID: {self.agent_id}")
+        # Reuse a registered agent if possible; the connection is only
+        # verified when a new agent has to be registered
+        if not self._use_cached_agent():
+            self._verify_connection()
+            agent_response = self.client.alpha.agents.create(agent_config=self.agent_config)
+            self._agent_registered(agent_response.agent_id)
     
     def _verify_connection(self):
         """Verify llamastack server is available."""
@@ -107,103 +264,82 @@ If you're unsure about an action, explain your reasoning."""
                 f"Please ensure llamastack is running. Error: {e}"
             )
     
-    def _extract_content_from_chunk(self, chunk) -> tuple[str, Optional[str], List, bool]:
+    def _checkout_session(self, session_key: Optional[str] = None) -> str:
+        """Reuse a pooled (or sticky) session, creating a new one if none is idle."""
+        session_id = self.session_pool.checkout(session_key)
+        if session_id:
+            if self.verbose:
+                print(f"♻️  Reusing agent session: {session_id}")
+            return session_id
+        
+        try:
+            session_response = self.client.alpha.agents.session.create(
+                agent_id=self.agent_id,
+                session_name=self.session_pool.new_session_name()
+            )
+        except Exception:
+            # A cached agent may be gone (e.g. the server was restarted):
+            # register it again and retry once
+            if not self._forget_cached_agent():
+                raise
+            self._verify_connection()
+            agent_response = self.client.alpha.agents.create(agent_config=self.agent_config)
+            self._agent_registered(agent_response.agent_id)
+            session_response = self.client.alpha.agents.session.create(
+                agent_id=self.agent_id,
+                session_name=self.session_pool.new_session_name()
+            )
+        session_id = session_response.session_id
+        
+        if self.verbose:
+            print(f"📝 Created agent session: {session_id}")
+        return session_id
+    
+    def _delete_evicted_sessions(self):
+        """Delete sessions evicted from the pool on the server (best effort)."""
+        for session_id in self.session_pool.pop_evicted():
+            try:
+                self.client.alpha.agents.session.delete(session_id, agent_id=self.agent_id)
+            except Exception:
+                pass
+    
+    def release_session(self, session_key: str):
         """
-        Extract content, turn_id, tool_calls, and completion status from a streaming chunk.
+        Drop the sticky session bound to session_key.
         
         Args:
-            chunk: AgentTurnResponseStreamChunk object
-            
-        Returns:
-            Tuple of (content, turn_id, tool_calls, is_complete)
-        """
-        content = ""
-        turn_id = None
-        tool_calls = []
-        is_complete = False
-        
-        if not (hasattr(chunk, 'event') and chunk.event):
-            return content, turn_id, tool_calls, is_complete
-        
-        event = chunk.event
-        
-        # Extract payload (contains the actual data)
-        payload = self._get_payload_dict(event)
-        if not payload:
-            return content, turn_id, tool_calls, is_complete
-        
-        # Extract content from delta (streaming chunks)
-        if 'delta' in payload and payload['delta']:
-            delta = payload['delta']
-            delta_dict = self._to_dict(delta)
-            if delta_dict:
-                # Try different content field names
-                if 'content' in delta_dict and delta_dict['content']:
-                    content = str(delta_dict['content'])
-                elif 'text' in delta_dict and delta_dict['text']:
-                    content = str(delta_dict['text'])
-        
-        # Extract turn_id
-        if 'turn_id' in payload and payload['turn_id']:
-            turn_id = payload['turn_id']
-        elif hasattr(event, 'turn_id') and event.turn_id:
-            turn_id = event.turn_id
-        
-        # Extract tool calls
-        if 'tool_calls' in payload and payload['tool_calls']:
-            tool_calls = payload['tool_calls'] if isinstance(payload['tool_calls'], list) else [payload['tool_calls']]
-        
-        # Check for completion
-        event_type = payload.get('event_type') or getattr(event, 'event_type', None)
-        if event_type in ['turn_complete', 'turn_end', 'complete', 'done']:
-            is_complete = True
-        
-        return content, turn_id, tool_calls, is_complete
-    
-    def _get_payload_dict(self, event) -> Optional[Dict]:
-        """Extract payload dictionary from event."""
-        if not hasattr(event, 'payload') or not event.payload:
-            return None
-        
-        payload = event.payload
-        return self._to_dict(payload)
-    
-    def _to_dict(self, obj) -> Optional[Dict]:
-        """Convert object to dictionary if possible."""
-        if isinstance(obj, dict):
-            return obj
-        if hasattr(obj, 'dict'):
-            return obj.dict()
-        if hasattr(obj, '__dict__'):
-            return obj.__dict__
-        return None
-    
-    def _run_with_llamastack(self, task: str, context: Optional[str] = None) -> Dict[str, Any]:
-        """
-        Run task using llamastack agent API.
+            session_key: Key previously passed to run()
+        """
+        self.session_pool.release(session_key)
+        self._delete_evicted_sessions()
+    
+    def close(self):
+        """Delete all pooled and sticky sessions held by this agent."""
+        self.session_pool.clear()
+        self._delete_evicted_sessions()
+    
+    def _stream_with_llamastack(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> Iterator[AgentEvent]:
+        """
+        Run task using llamastack agent API, yielding events as they arrive.
         
         Args:
             task: Description of the task to perform
             context: Optional additional context
+            session_key: Optional sticky session key
             
-        Returns:
-            Dictionary with execution results
+        Yields:
+            Decoded events, ending with TurnCompleted
         """
-        # Build messages
-        input_text = f"Context: {context}\n\nTask: {task}" if context else task
-        messages = [{"role": "user", "content": input_text}]
+        messages = self._build_messages(task, context)
+        session_id = None
         
         try:
-            # Create agent session
-            session_name = f"session-{int(time.time())}"
-            session_response = self.client.alpha.agents.session.create(
-                agent_id=self.agent_id,
-                session_name=session_name
-            )
-            session_id = session_response.session_id
-            
-            if self.verbose:
-                print(f"📝 Created agent session: {session_id}")
+            session_id = self._checkout_session(session_key)
             
             # Create turn and process streaming response
             turn_stream = self.client.alpha.agents.turn.create(
@@ -214,43 +350,73 @@ If you're unsure about an action, explain your reasoning."""
             )
             
             # Process streaming chunks
-            result = ""
-            turn_id = None
-            tool_calls = []
-            
+            decoder = TurnStreamDecoder()
             for chunk in turn_stream:
-                chunk_content, chunk_turn_id, chunk_tool_calls, is_complete = self._extract_content_from_chunk(chunk)
-                
-                result += chunk_content
-                if chunk_turn_id and not turn_id:
-                    turn_id = chunk_turn_id
-                if chunk_tool_calls:
-                    tool_calls.extend(chunk_tool_calls)
-                
-                if is_complete:
+                yield from decoder.feed(chunk)
+                if decoder.is_complete:
                     break
             
-            return {
-                "success": True,
-                "result": result.strip() or "Task completed (no output received)",
-                "session_id": session_id,
-                "turn_id": turn_id,
-                "tool_calls": tool_calls
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "result": None
-            }
+            self.session_pool.checkin(session_id, session_key)
+            result = self._turn_result(session_id, decoder)
+        except BaseException as e:
+            # Also covers the consumer abandoning the stream: the session
+            # may be mid-turn, so it must not go back into the pool
+            if session_id:
+                self.session_pool.discard(session_id)
+            if not isinstance(e, Exception):
+                raise
+            result = self._error_result(e)
+        finally:
+            self._delete_evicted_sessions()
+        
+        yield TurnCompleted(result=result)
     
-    def run(self, task: str, context: Optional[str] = None) -> Dict[str, Any]:
+    def run_stream(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> Iterator[AgentEvent]:
+        """
+        Execute a task using llamastack, yielding events as they arrive.
+        
+        Events are TextDelta, ToolCallStarted and ToolCallFinished while the
+        turn runs, followed by one TurnCompleted whose result is the
+        dictionary run() returns.
+        
+        Args:
+            task: Description of the task to perform
+            context: Optional additional context
+            session_key: Optional sticky session key; runs with the same key
+                (e.g. an incident ID) continue in the same session
+            
+        Yields:
+            Agent events
+            
+        Raises:
+            ConnectionError: If llamastack is not available
+        """
+        self._check_url()
+        
+        for event in self._stream_with_llamastack(task, context, session_key):
+            if isinstance(event, TurnCompleted):
+                self._remember_execution(task, context, event.result)
+            yield event
+    
+    def run(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute a task using llamastack.
         
         Args:
             task: Description of the task to perform
             context: Optional additional context
+            session_key: Optional sticky session key; runs with the same key
+                (e.g. an incident ID) continue in the same session
             
         Returns:
             Dictionary with execution results
@@ -258,70 +424,386 @@ If you're unsure about an action, explain your reasoning."""
         Raises:
             ConnectionError: If llamastack is not available
         """
-        # Check if llamastack_url is valid (handle both string and URL object)
-        url_str = str(self.llamastack_url) if self.llamastack_url else ""
-        if not url_str or not url_str.startswith("http"):
+        result = None
+        for event in self.run_stream(task, context, session_key):
+            if isinstance(event, TurnCompleted):
+                result = event.result
+        return result
+    
+    def analyze_environment(self) -> Dict[str, Any]:
+        """Analyze the current environment state."""
+        return self.run(self.ANALYZE_TASK)
+    
+    def remediate_issue(self, issue_description: str, session_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Remediate a specific issue.
+        
+        Args:
+            issue_description: Description of the issue to fix
+            session_key: Optional sticky session key (e.g. the incident ID)
+            
+        Returns:
+            Dictionary with remediation results
+        """
+        task, context = self._remediation_task(issue_description)
+        return self.run(task, context=context, session_key=session_key)
+
+
+
+# A task for run_many(): a bare task string, a (task, context) pair
+# or a (task, context, session_key) triple
+TaskSpec = Union[str, Tuple[str, Optional[str]], Tuple[str, Optional[str], Optional[str]]]
+
+
+class AsyncAutonomousAgent(_AgentBase):
+    """
+    Asynchronous variant of AutonomousAgent built on AsyncLlamaStackClient.
+    
+    Use this when many tasks (e.g. a batch of incidents) need to be worked
+    on at once: run_many() fans tasks out concurrently under a concurrency
+    limit and returns results in the same order as the input tasks.
+    
+    The agent is registered with llamastack lazily, on the first call to
+    arun(), because registration requires an event loop.
+    
+    The async agent has no synchronous entry points: its client is bound to
+    the event loop it first runs on, so use arun(), aanalyze_environment()
+    and aremediate_issue() from that loop (in Jupyter, simply await them).
+    """
+    
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        memory: Optional[AgentMemory] = None,
+        llamastack_url: Optional[str] = None,
+        model: str = os.getenv("LLAMA_MODEL", "openai/vllm-inference/llama-32-3b-instruct"),
+        instructions: Optional[str] = None,
+        verbose: bool = True,
+        session_pool_size: int = 0,
+        session_idle_ttl: Optional[float] = 300.0,
+        cache_agent: bool = True,
+        agent_cache: Optional[AgentCache] = None,
+        max_concurrency: int = 8,
+        task_timeout: Optional[float] = None
+    ):
+        """
+        Initialize asynchronous autonomous agent.
+        
+        Args:
+            tool_registry: Registry containing available tools
+            memory: Optional memory system for learning
+            llamastack_url: URL of llamastack server (default: http://localhost:8321)
+            model: Model identifier (default: openai/vllm-inference/llama-32-3b-instruct)
+            instructions: Custom agent instructions (uses default if not provided)
+            verbose: Whether to print detailed execution logs
+            session_pool_size: Idle sessions kept for reuse across runs (0 = new session per run)
+            session_idle_ttl: Seconds an idle session is kept before it is deleted
+            cache_agent: Reuse an agent already registered with the same configuration
+            agent_cache: Cache of registered agents (default: shared process-wide cache)
+            max_concurrency: Default maximum number of tasks run_many() runs at once
+            task_timeout: Default per-task timeout in seconds (None = no timeout)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        self.tool_registry = tool_registry
+        self.memory = memory or AgentMemory()
+        self.verbose = verbose
+        self.session_pool = SessionPool(max_size=session_pool_size, idle_ttl=session_idle_ttl)
+        self.max_concurrency = max_concurrency
+        self.task_timeout = task_timeout
+        
+        # Initialize async llamastack client
+        self.llamastack_url = llamastack_url or os.getenv("LLAMA_STACK_URL", "http://localhost:8321")
+        self.client = AsyncLlamaStackClient(base_url=self.llamastack_url)
+        
+        # A cached agent is adopted right away; otherwise the agent is
+        # registered on first use (see _ensure_agent)
+        self._init_agent_config(model, instructions, cache_agent, agent_cache)
+        self._use_cached_agent()
+        self._agent_lock: Optional[asyncio.Lock] = None
+    
+    async def _verify_connection_async(self):
+        """Verify llamastack server is available."""
+        try:
+            await self.client.models.list()
+        except Exception as e:
             raise ConnectionError(
-                "LlamaStack URL is not configured. Please set LLAMA_STACK_URL environment variable."
+                f"Cannot connect to llamastack server at {self.llamastack_url}. "
+                f"Please ensure llamastack is running. Error: {e}"
             )
+    
+    async def _ensure_agent(self, stale_agent_id: Optional[str] = None) -> str:
+        """
+        Register the agent with llamastack once and return its agent_id.
         
-        result = self._run_with_llamastack(task, context)
+        Args:
+            stale_agent_id: Agent ID the server rejected, forcing a new registration
+        """
+        if self.agent_id and self.agent_id != stale_agent_id:
+            return self.agent_id
         
-        # Store in memory
-        if self.memory:
-            self.memory.remember_action(
-                action_type="agent_execution",
-                action_params={"task": task, "context": context},
-                result=result,
-                success=result.get("success", False),
-                context=context or ""
+        if self._agent_lock is None:
+            self._agent_lock = asyncio.Lock()
+        
+        async with self._agent_lock:
+            # Another task may have registered the agent while we waited
+            if self.agent_id and self.agent_id != stale_agent_id:
+                return self.agent_id
+            
+            await self._verify_connection_async()
+            agent_response = await self.client.alpha.agents.create(agent_config=self.agent_config)
+            self._agent_registered(agent_response.agent_id)
+        
+        return self.agent_id
+    
+    async def _acheckout_session(self, session_key: Optional[str] = None) -> str:
+        """Reuse a pooled (or sticky) session, creating a new one if none is idle."""
+        session_id = self.session_pool.checkout(session_key)
+        if session_id:
+            if self.verbose:
+                print(f"♻️  Reusing agent session: {session_id}")
+            return session_id
+        
+        try:
+            session_response = await self.client.alpha.agents.session.create(
+                agent_id=self.agent_id,
+                session_name=self.session_pool.new_session_name()
+            )
+        except Exception:
+            # A cached agent may be gone (e.g. the server was restarted):
+            # register it again and retry once
+            stale_agent_id = self.agent_id
+            if not self._forget_cached_agent():
+                raise
+            await self._ensure_agent(stale_agent_id)
+            session_response = await self.client.alpha.agents.session.create(
+                agent_id=self.agent_id,
+                session_name=self.session_pool.new_session_name()
             )
+        session_id = session_response.session_id
         
-        return result
+        if self.verbose:
+            print(f"📝 Created agent session: {session_id}")
+        return session_id
     
-    def analyze_environment(self) -> Dict[str, Any]:
+    async def _adelete_evicted_sessions(self):
+        """Delete sessions evicted from the pool on the server (best effort)."""
+        for session_id in self.session_pool.pop_evicted():
+            try:
+                await self.client.alpha.agents.session.delete(session_id, agent_id=self.agent_id)
+            except Exception:
+                pass
+    
+    async def arelease_session(self, session_key: str):
+        """
+        Drop the sticky session bound to session_key.
+        
+        Args:
+            session_key: Key previously passed to arun()
+        """
+        self.session_pool.release(session_key)
+        await self._adelete_evicted_sessions()
+    
+    async def aclose(self):
+        """Delete all pooled and sticky sessions held by this agent."""
+        self.session_pool.clear()
+        await self._adelete_evicted_sessions()
+    
+    async def _astream_with_llamastack(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> AsyncIterator[AgentEvent]:
+        """
+        Run task using the async llamastack agent API, yielding events as they arrive.
+        
+        Args:
+            task: Description of the task to perform
+            context: Optional additional context
+            session_key: Optional sticky session key
+            
+        Yields:
+            Decoded events, ending with TurnCompleted
+        """
+        messages = self._build_messages(task, context)
+        session_id = None
+        
+        try:
+            await self._ensure_agent()
+            session_id = await self._acheckout_session(session_key)
+            
+            # Create turn and process streaming response (checkout may have
+            # registered the agent again, so agent_id is read afterwards)
+            turn_stream = await self.client.alpha.agents.turn.create(
+                agent_id=self.agent_id,
+                session_id=session_id,
+                messages=messages,
+                stream=True
+            )
+            
+            # Process streaming chunks
+            decoder = TurnStreamDecoder()
+            async for chunk in turn_stream:
+                for event in decoder.feed(chunk):
+                    yield event
+                if decoder.is_complete:
+                    break
+            
+            self.session_pool.checkin(session_id, session_key)
+            result = self._turn_result(session_id, decoder)
+        except BaseException as e:
+            # Also covers cancellation by a timeout or the consumer abandoning
+            # the stream: the session may be mid-turn, so it must not go back
+            # into the pool
+            if session_id:
+                self.session_pool.discard(session_id)
+            if not isinstance(e, Exception):
+                raise
+            result = self._error_result(e)
+        finally:
+            await self._adelete_evicted_sessions()
+        
+        yield TurnCompleted(result=result)
+    
+    async def arun_stream(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> AsyncIterator[AgentEvent]:
+        """
+        Execute a task using llamastack, yielding events as they arrive.
+        
+        Events are TextDelta, ToolCallStarted and ToolCallFinished while the
+        turn runs, followed by one TurnCompleted whose result is the
+        dictionary arun() returns.
+        
+        Args:
+            task: Description of the task to perform
+            context: Optional additional context
+            session_key: Optional sticky session key; runs with the same key
+                (e.g. an incident ID) continue in the same session
+            
+        Yields:
+            Agent events
+            
+        Raises:
+            ConnectionError: If llamastack is not available
+        """
+        self._check_url()
+        
+        async for event in self._astream_with_llamastack(task, context, session_key):
+            if isinstance(event, TurnCompleted):
+                self._remember_execution(task, context, event.result)
+            yield event
+    
+    async def arun(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        timeout: Optional[float] = None,
+        session_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a task using llamastack without blocking the event loop.
+        
+        Args:
+            task: Description of the task to perform
+            context: Optional additional context
+            timeout: Timeout in seconds (defaults to task_timeout)
+            session_key: Optional sticky session key; runs with the same key
+                (e.g. an incident ID) continue in the same session
+            
+        Returns:
+            Dictionary with execution results
+            
+        Raises:
+            ConnectionError: If llamastack is not available
+        """
+        async def collect() -> Dict[str, Any]:
+            result = None
+            async for event in self.arun_stream(task, context, session_key):
+                if isinstance(event, TurnCompleted):
+                    result = event.result
+            return result
+        
+        timeout = self.task_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(collect(), timeout)
+        except asyncio.TimeoutError:
+            result = {
+                "success": False,
+                "error": f"Task timed out after {timeout} seconds",
+                "result": None
+            }
+            self._remember_execution(task, context, result)
+            return result
+    
+    async def run_many(
+        self,
+        tasks: Sequence[TaskSpec],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute many tasks concurrently.
+        
+        Args:
+            tasks: Task strings, (task, context) pairs or (task, context, session_key) triples
+            max_concurrency: Maximum tasks in flight (defaults to max_concurrency)
+            timeout: Per-task timeout in seconds (defaults to task_timeout)
+            
+        Returns:
+            List of result dictionaries, in the same order as tasks
+        """
+        limit = max_concurrency or self.max_concurrency
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def run_one(spec: TaskSpec) -> Dict[str, Any]:
+            if isinstance(spec, str):
+                spec = (spec,)
+            task, context, session_key = (tuple(spec) + (None, None))[:3]
+            async with semaphore:
+                return await self.arun(task, context=context, timeout=timeout, session_key=session_key)
+        
+        return await asyncio.gather(*(run_one(spec) for spec in tasks))
+    
+    async def aanalyze_environment(self) -> Dict[str, Any]:
         """Analyze the current environment state."""
-        task = "Analyze the current state of all IT services. Check each service and identify any problems or issues that need attention."
-        return self.run(task)
+        return await self.arun(self.ANALYZE_TASK)
     
-    def remediate_issue(self, issue_description: str) -> Dict[str, Any]:
+    async def aremediate_issue(self, issue_description: str, session_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Remediate a specific issue.
         
         Args:
             issue_description: Description of the issue to fix
+            session_key: Optional sticky session key (e.g. the incident ID)
             
         Returns:
             Dictionary with remediation results
         """
-        context = None
-        if self.memory:
-            similar_problems = self.memory.get_similar_problems(issue_description, limit=3)
-            if similar_problems:
-                context = "Similar problems solved before:\n"
-                context += "\n".join(
-                    f"- {p.problem_description}: {'Solved' if p.success else 'Failed'}"
-                    for p in similar_problems
-                )
-        
-        task = f"Remediate the following issue: {issue_description}"
-        return self.run(task, context=context)
+        task, context = self._remediation_task(issue_description)
+        return await self.arun(task, context=context, session_key=session_key)
     
-    def get_memory_stats(self) -> Dict[str, Any]:
-        """Get statistics about agent's memory."""
-        if not self.memory:
-            return {"error": "Memory not enabled"}
+    async def remediate_issues(
+        self,
+        issue_descriptions: Sequence[str],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Remediate many issues concurrently.
         
-        return {
-            "action_statistics": self.memory.get_action_statistics(),
-            "total_actions": len(self.memory.action_history),
-            "total_problems_solved": len([p for p in self.memory.problem_solutions if p.success]),
-            "recent_actions": [
-                {
-                    "type": a.action_type,
-                    "success": a.success,
-                    "timestamp": a.timestamp
-                }
-                for a in self.memory.get_recent_actions(limit=5)
-            ]
-        }
+        Args:
+            issue_descriptions: Descriptions of the issues to fix
+            max_concurrency: Maximum tasks in flight (defaults to max_concurrency)
+            timeout: Per-task timeout in seconds (defaults to task_timeout)
+            
+        Returns:
+            List of remediation results, in the same order as issue_descriptions
+        """
+        specs = [self._remediation_task(issue) for issue in issue_descriptions]
+        return await self.run_many(specs, max_concurrency=max_concurrency, timeout=timeout)
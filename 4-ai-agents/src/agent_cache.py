@@ -0,0 +1,133 @@
+"""
+Agent Registration Cache
+
+This module caches llamastack agent IDs so that agents with the same
+configuration (server, model, instructions and tools) are registered once
+and reused, instead of calling agents.create for every AutonomousAgent.
+"""
+
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import threading
+
+
+def agent_cache_key(
+    llamastack_url: str,
+    agent_config: Dict[str, Any],
+    tools_hash: Optional[str] = None
+) -> str:
+    """
+    Build a stable cache key for an agent configuration.
+    
+    Args:
+        llamastack_url: URL of the llamastack server the agent lives on
+        agent_config: Agent configuration passed to agents.create
+        tools_hash: Precomputed hash of the tool schemas (ToolRegistry.schema_hash);
+            when given, the "tools" entry is not serialized again
+        
+    Returns:
+        Hex digest identifying the configuration
+    """
+    if tools_hash is not None:
+        agent_config = {key: value for key, value in agent_config.items() if key != "tools"}
+        agent_config["tools_hash"] = tools_hash
+    canonical = json.dumps(
+        {"url": str(llamastack_url), "agent_config": agent_config},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AgentCache:
+    """
+    Process-wide cache of registered agent IDs, optionally persisted to disk.
+    
+    With a filepath, entries are stored as a small JSON document so worker
+    processes (and restarts) can reuse agents registered by others.
+    """
+    
+    def __init__(self, filepath: Optional[str] = None):
+        """
+        Initialize agent cache.
+        
+        Args:
+            filepath: Optional JSON file to persist entries to
+        """
+        self.filepath = filepath
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._reload()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached agent ID.
+        
+        Args:
+            key: Key from agent_cache_key()
+            
+        Returns:
+            Agent ID or None if not cached
+        """
+        with self._lock:
+            agent_id = self._entries.get(key)
+            if agent_id is None and self.filepath:
+                # Another process may have registered it in the meantime
+                self._reload()
+                agent_id = self._entries.get(key)
+            return agent_id
+    
+    def put(self, key: str, agent_id: str):
+        """
+        Cache an agent ID.
+        
+        Args:
+            key: Key from agent_cache_key()
+            agent_id: Agent ID returned by agents.create
+        """
+        with self._lock:
+            self._entries[key] = agent_id
+            self._persist()
+    
+    def invalidate(self, key: str):
+        """Forget a cached agent ID (e.g. after the server lost it)."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._persist()
+    
+    def clear(self):
+        """Forget all cached agent IDs."""
+        with self._lock:
+            self._entries = {}
+            self._persist()
+    
+    def _reload(self):
+        """Merge entries from the cache file (caller holds the lock)."""
+        if not self.filepath or not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, 'r') as f:
+                self._entries.update(json.load(f))
+        except (OSError, ValueError):
+            # A corrupt or unreadable cache only costs a re-registration
+            pass
+    
+    def _persist(self):
+        """Atomically write entries to the cache file (caller holds the lock)."""
+        if not self.filepath:
+            return
+        tmp_path = f"{self.filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.filepath)
+    
+    def __len__(self) -> int:
+        """Number of cached agent IDs."""
+        return len(self._entries)
+
+
+# Shared by all agents in the process; set LLAMA_AGENT_CACHE_FILE to persist it
+DEFAULT_AGENT_CACHE = AgentCache(os.getenv("LLAMA_AGENT_CACHE_FILE") or None)
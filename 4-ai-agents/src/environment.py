@@ -5,12 +5,21 @@ This module provides a simulated IT environment for safe agent training
 and demonstration. In production, this would connect to real IT systems.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
+import heapq
+import itertools
 import random
+import threading
 import time
 
+# Handle both relative and absolute imports
+try:
+    from .action_log import ActionLog
+except ImportError:
+    from action_log import ActionLog
+
 
 class ServiceStatus(Enum):
     """Service status enumeration"""
@@ -42,23 +51,129 @@ class Service:
         }
 
 
+@dataclass(frozen=True)
+class EnvironmentSnapshot:
+    """
+    Immutable, picklable copy of a SimulatedEnvironment's state.
+    
+    Service state is stored as tuples and the action log entries are shared
+    by reference (they are never modified once logged), so taking a
+    snapshot and forking branches from it copies no nested data.
+    """
+    services: Tuple[Tuple[str, str, float, float, Optional[float], int], ...]
+    action_log: Tuple[Dict[str, Any], ...]
+    action_log_capacity: Optional[int]
+    time: float
+    virtual_time: bool
+    restart_duration: float
+    scale_duration: float
+    seed: Optional[int]
+    rng_state: tuple
+    events: Tuple[Tuple[float, int, str, tuple], ...]
+    event_seq: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-compatible dictionary"""
+        version, internal_state, gauss_next = self.rng_state
+        return {
+            "services": [list(service) for service in self.services],
+            "action_log": list(self.action_log),
+            "action_log_capacity": self.action_log_capacity,
+            "time": self.time,
+            "virtual_time": self.virtual_time,
+            "restart_duration": self.restart_duration,
+            "scale_duration": self.scale_duration,
+            "seed": self.seed,
+            "rng_state": [version, list(internal_state), gauss_next],
+            "events": [[due, seq, name, list(args)] for due, seq, name, args in self.events],
+            "event_seq": self.event_seq
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EnvironmentSnapshot":
+        """Create from dictionary"""
+        version, internal_state, gauss_next = data["rng_state"]
+        return cls(
+            services=tuple(tuple(service) for service in data["services"]),
+            action_log=tuple(data["action_log"]),
+            action_log_capacity=data["action_log_capacity"],
+            time=data["time"],
+            virtual_time=data["virtual_time"],
+            restart_duration=data["restart_duration"],
+            scale_duration=data["scale_duration"],
+            seed=data["seed"],
+            rng_state=(version, tuple(internal_state), gauss_next),
+            events=tuple((due, seq, name, tuple(args)) for due, seq, name, args in data["events"]),
+            event_seq=data["event_seq"]
+        )
+
+
+def _batch_result(operation: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-service results of a batch operation"""
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "success": succeeded == len(results),
+        "message": f"{operation} succeeded for {succeeded} of {len(results)} services",
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+
 class SimulatedEnvironment:
     """
     Simulated IT environment for agent interaction.
     
     This provides a safe way to test agents without affecting real systems.
+    
+    By default actions run against the wall clock: restart_service sleeps
+    for restart_duration on the caller's thread. With virtual_time=True,
+    self.time is a simulation clock instead. Restarts and scaling are
+    scheduled as events that complete restart_duration / scale_duration
+    simulated seconds later, and the clock only moves when advance() or
+    run_until_idle() is called, so runs are deterministic and never sleep.
     """
     
-    def __init__(self, initial_services: Optional[List[str]] = None):
+    def __init__(
+        self,
+        initial_services: Optional[List[str]] = None,
+        virtual_time: bool = False,
+        restart_duration: float = 0.1,
+        scale_duration: float = 0.0,
+        start_time: Optional[float] = None,
+        action_log_capacity: Optional[int] = None,
+        action_log_spill_path: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
         """
         Initialize simulated environment.
         
         Args:
             initial_services: List of service names to create
+            virtual_time: Use a simulation clock and scheduled events instead of sleeping
+            restart_duration: Seconds a restart takes
+            scale_duration: Seconds a scaling operation takes (virtual time only)
+            start_time: Initial clock value (default: 0.0 in virtual time, else time.time())
+            action_log_capacity: Maximum action log entries kept in memory (None = unbounded)
+            action_log_spill_path: Optional JSONL file that evicted log entries are appended to
+            seed: Seed for this environment's random generator (None = nondeterministic)
         """
         self.services: Dict[str, Service] = {}
-        self.action_log: List[Dict[str, Any]] = []
-        self.time: float = time.time()
+        self.action_log = ActionLog(action_log_capacity, action_log_spill_path)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.virtual_time = virtual_time
+        self.restart_duration = restart_duration
+        self.scale_duration = scale_duration
+        if start_time is None:
+            start_time = 0.0 if virtual_time else time.time()
+        self.time: float = start_time
+        self._events: List[Tuple[float, int, Union[str, Callable], tuple]] = []
+        self._event_seq = 0
+        self._schedule_lock = threading.Lock()
+        # Bumped after every change to service state, including scheduled ones
+        self.state_version = 0
+        self._state_versions = itertools.count(1)
         
         # Create initial services
         if initial_services:
@@ -92,8 +207,8 @@ class SimulatedEnvironment:
         service = self.services[service_name]
         
         # Simulate some variability in metrics
-        service.cpu_usage = max(0, min(100, service.cpu_usage + random.uniform(-5, 5)))
-        service.memory_usage = max(0, min(100, service.memory_usage + random.uniform(-2, 2)))
+        service.cpu_usage = max(0, min(100, service.cpu_usage + self.rng.uniform(-5, 5)))
+        service.memory_usage = max(0, min(100, service.memory_usage + self.rng.uniform(-2, 2)))
         
         return service.to_dict()
     
@@ -101,6 +216,18 @@ class SimulatedEnvironment:
         """Get status of all services"""
         return [service.to_dict() for service in self.services.values()]
     
+    def get_services_status(self, service_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get status of several services at once.
+        
+        Args:
+            service_names: Names of the services
+            
+        Returns:
+            Dictionary of service name to status dictionary (None if the service doesn't exist)
+        """
+        return {name: self.get_service_status(name) for name in dict.fromkeys(service_names)}
+    
     def restart_service(self, service_name: str) -> Dict[str, Any]:
         """
         Restart a service.
@@ -111,6 +238,28 @@ class SimulatedEnvironment:
         Returns:
             Result dictionary with success status and message
         """
+        return self._restart(service_name, wait=True)
+    
+    def restart_services(self, service_names: List[str]) -> Dict[str, Any]:
+        """
+        Restart several services concurrently.
+        
+        The restarts overlap, so a batch takes one restart_duration instead
+        of one per service.
+        
+        Args:
+            service_names: Names of the services to restart
+            
+        Returns:
+            Aggregated result dictionary with per-service results
+        """
+        names = list(dict.fromkeys(service_names))
+        if not self.virtual_time and any(name in self.services for name in names):
+            time.sleep(self.restart_duration)  # Simulate restart time, once for the batch
+        return _batch_result("Restart", [self._restart(name, wait=False) for name in names])
+    
+    def _restart(self, service_name: str, wait: bool) -> Dict[str, Any]:
+        """Restart a service, sleeping for the restart time in wall-clock mode if wait is set"""
         if service_name not in self.services:
             result = {
                 "success": False,
@@ -122,14 +271,30 @@ class SimulatedEnvironment:
         
         service = self.services[service_name]
         
+        if self.virtual_time and self.restart_duration > 0:
+            # The service is down until the scheduled restart completes
+            service.status = ServiceStatus.STOPPED
+            service.cpu_usage = 0.0
+            service.memory_usage = 0.0
+            self._state_changed()
+            completes_at = self.schedule(self.restart_duration, "_finish_restart", service_name)
+            
+            result = {
+                "success": True,
+                "message": f"Service '{service_name}' restart scheduled",
+                "service_name": service_name,
+                "status": service.status.value,
+                "restart_count": service.restart_count,
+                "completes_at": completes_at
+            }
+            self._log_action("restart_service", result)
+            return result
+        
         # Simulate restart process
-        time.sleep(0.1)  # Simulate restart time
+        if wait and not self.virtual_time:
+            time.sleep(self.restart_duration)  # Simulate restart time
         
-        service.status = ServiceStatus.RUNNING
-        service.last_restart = time.time()
-        service.restart_count += 1
-        service.cpu_usage = random.uniform(10, 30)  # Reset to normal after restart
-        service.memory_usage = random.uniform(20, 40)
+        self._finish_restart(service_name)
         
         result = {
             "success": True,
@@ -163,10 +328,19 @@ class SimulatedEnvironment:
         
         service = self.services[service_name]
         
-        # Simulate scaling effect on metrics
-        if replicas > 1:
-            service.cpu_usage = max(0, service.cpu_usage - 10 * (replicas - 1))
-            service.memory_usage = max(0, service.memory_usage - 5 * (replicas - 1))
+        if self.virtual_time and self.scale_duration > 0:
+            completes_at = self.schedule(self.scale_duration, "_finish_scale", service_name, replicas)
+            result = {
+                "success": True,
+                "message": f"Service '{service_name}' scaling to {replicas} replicas scheduled",
+                "service_name": service_name,
+                "replicas": replicas,
+                "completes_at": completes_at
+            }
+            self._log_action("scale_service", result)
+            return result
+        
+        self._finish_scale(service_name, replicas)
         
         result = {
             "success": True,
@@ -179,6 +353,230 @@ class SimulatedEnvironment:
         self._log_action("scale_service", result)
         return result
     
+    def scale_services(self, replicas_by_service: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Scale several services at once.
+        
+        Args:
+            replicas_by_service: Dictionary of service name to number of replicas
+            
+        Returns:
+            Aggregated result dictionary with per-service results
+        """
+        return _batch_result("Scale", [
+            self.scale_service(name, replicas) for name, replicas in replicas_by_service.items()
+        ])
+    
+    def _finish_restart(self, service_name: str):
+        """Bring a service back up after a restart"""
+        service = self.services[service_name]
+        service.status = ServiceStatus.RUNNING
+        service.last_restart = self.now()
+        service.restart_count += 1
+        service.cpu_usage = self.rng.uniform(10, 30)  # Reset to normal after restart
+        service.memory_usage = self.rng.uniform(20, 40)
+        self._state_changed()
+    
+    def _finish_scale(self, service_name: str, replicas: int):
+        """Apply the effect of scaling on a service's metrics"""
+        service = self.services[service_name]
+        if replicas > 1:
+            service.cpu_usage = max(0, service.cpu_usage - 10 * (replicas - 1))
+            service.memory_usage = max(0, service.memory_usage - 5 * (replicas - 1))
+        self._state_changed()
+    
+    def _state_changed(self):
+        """
+        Record a change to service state.
+        
+        Called after the change is applied, so a reader that saw the old
+        state_version also saw the old state. Cached tool results are only
+        reused while state_version is unchanged.
+        """
+        self.state_version = next(self._state_versions)
+    
+    def now(self) -> float:
+        """Current time: the simulation clock in virtual time, else wall-clock time"""
+        return self.time if self.virtual_time else time.time()
+    
+    def schedule(self, delay: float, callback: Union[str, Callable], *args) -> float:
+        """
+        Schedule a callback to run after delay simulated seconds.
+        
+        Events scheduled by method name (e.g. "simulate_failure") are plain
+        data, so they survive snapshot() and fork(); events with a callable
+        cannot be snapshotted.
+        
+        Args:
+            delay: Seconds from the current simulation time
+            callback: Name of an environment method, or a function
+            *args: Arguments passed to the callback when the event fires
+            
+        Returns:
+            Simulation time at which the event fires
+        """
+        due = self.time + max(0.0, delay)
+        with self._schedule_lock:
+            heapq.heappush(self._events, (due, self._event_seq, callback, args))
+            self._event_seq += 1
+        return due
+    
+    def _fire(self, callback: Union[str, Callable], args: tuple):
+        """Run a scheduled event"""
+        if isinstance(callback, str):
+            callback = getattr(self, callback)
+        callback(*args)
+    
+    @property
+    def pending_events(self) -> int:
+        """Number of scheduled events that have not fired yet"""
+        return len(self._events)
+    
+    def advance(self, seconds: float) -> int:
+        """
+        Move the simulation clock forward, firing events that become due.
+        
+        Events fire in time order (ties in scheduling order), with self.time
+        set to each event's due time while it runs.
+        
+        Args:
+            seconds: Simulated seconds to advance
+            
+        Returns:
+            Number of events fired
+        """
+        target = self.time + seconds
+        fired = 0
+        while self._events and self._events[0][0] <= target:
+            due, _, callback, args = heapq.heappop(self._events)
+            self.time = max(self.time, due)
+            self._fire(callback, args)
+            fired += 1
+        self.time = max(self.time, target)
+        return fired
+    
+    def run_until_idle(self) -> int:
+        """
+        Fire all scheduled events, advancing the clock to the last one.
+        
+        Returns:
+            Number of events fired
+        """
+        fired = 0
+        while self._events:
+            due, _, callback, args = heapq.heappop(self._events)
+            self.time = max(self.time, due)
+            self._fire(callback, args)
+            fired += 1
+        return fired
+    
+    def snapshot(self) -> EnvironmentSnapshot:
+        """
+        Capture the environment state (services, action log, clock, RNG and
+        pending events) as an immutable, picklable snapshot.
+        
+        Returns:
+            Environment snapshot
+        """
+        if any(not isinstance(event[2], str) for event in self._events):
+            raise ValueError(
+                "Cannot snapshot pending events scheduled with a callable; schedule them by method name"
+            )
+        
+        return EnvironmentSnapshot(
+            services=tuple(
+                (
+                    service.name,
+                    service.status.value,
+                    service.cpu_usage,
+                    service.memory_usage,
+                    service.last_restart,
+                    service.restart_count
+                )
+                for service in self.services.values()
+            ),
+            action_log=tuple(self.action_log),
+            action_log_capacity=self.action_log.capacity,
+            time=self.time,
+            virtual_time=self.virtual_time,
+            restart_duration=self.restart_duration,
+            scale_duration=self.scale_duration,
+            seed=self.seed,
+            rng_state=self.rng.getstate(),
+            events=tuple(sorted(self._events)),
+            event_seq=self._event_seq
+        )
+    
+    def restore(self, snapshot: EnvironmentSnapshot):
+        """
+        Roll the environment back to a snapshot.
+        
+        Args:
+            snapshot: Snapshot from snapshot() (of this or another environment)
+        """
+        self.services = {
+            name: Service(
+                name=name,
+                status=ServiceStatus(status),
+                cpu_usage=cpu_usage,
+                memory_usage=memory_usage,
+                last_restart=last_restart,
+                restart_count=restart_count
+            )
+            for name, status, cpu_usage, memory_usage, last_restart, restart_count in snapshot.services
+        }
+        
+        spill_path = self.action_log.spill_path
+        self.action_log.close()
+        self.action_log = ActionLog(snapshot.action_log_capacity, spill_path)
+        for entry in snapshot.action_log:
+            self.action_log.append(entry)
+        
+        self.time = snapshot.time
+        self.virtual_time = snapshot.virtual_time
+        self.restart_duration = snapshot.restart_duration
+        self.scale_duration = snapshot.scale_duration
+        self.seed = snapshot.seed
+        self.rng.setstate(snapshot.rng_state)
+        self._events = list(snapshot.events)  # Sorted, so already a valid heap
+        self._event_seq = snapshot.event_seq
+        self._state_changed()
+    
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: EnvironmentSnapshot,
+        seed: Optional[int] = None
+    ) -> "SimulatedEnvironment":
+        """
+        Create a new environment from a snapshot (e.g. in a worker process).
+        
+        Args:
+            snapshot: Snapshot to start from
+            seed: Reseed the new environment's RNG so branches diverge (None = same RNG state)
+            
+        Returns:
+            New environment in the snapshot's state
+        """
+        environment = cls(initial_services=[])
+        environment.restore(snapshot)
+        if seed is not None:
+            environment.seed = seed
+            environment.rng.seed(seed)
+        return environment
+    
+    def fork(self, seed: Optional[int] = None) -> "SimulatedEnvironment":
+        """
+        Create an independent copy of this environment for what-if evaluation.
+        
+        Args:
+            seed: Reseed the fork's RNG so branches diverge (None = same RNG state)
+            
+        Returns:
+            New environment; changes to it do not affect this one
+        """
+        return self.from_snapshot(self.snapshot(), seed=seed)
+    
     def simulate_failure(self, service_name: str) -> Dict[str, Any]:
         """
         Simulate a service failure (for testing purposes).
@@ -199,6 +597,7 @@ class SimulatedEnvironment:
         service.status = ServiceStatus.FAILED
         service.cpu_usage = 0.0
         service.memory_usage = 0.0
+        self._state_changed()
         
         result = {
             "success": True,
@@ -227,8 +626,9 @@ class SimulatedEnvironment:
         
         service = self.services[service_name]
         service.status = ServiceStatus.DEGRADED
-        service.cpu_usage = random.uniform(85, 95)
-        service.memory_usage = random.uniform(80, 90)
+        service.cpu_usage = self.rng.uniform(85, 95)
+        service.memory_usage = self.rng.uniform(80, 90)
+        self._state_changed()
         
         result = {
             "success": True,
@@ -244,33 +644,40 @@ class SimulatedEnvironment:
     def _log_action(self, action_type: str, result: Dict[str, Any]):
         """Log an action for audit purposes"""
         log_entry = {
-            "timestamp": time.time(),
+            "timestamp": self.now(),
             "action": action_type,
             "result": result
         }
         self.action_log.append(log_entry)
     
-    def get_action_log(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    def get_action_log(
+        self,
+        limit: Optional[int] = None,
+        service_name: Optional[str] = None,
+        action: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get action log.
         
         Args:
             limit: Maximum number of entries to return
+            service_name: Only return entries for this service
+            action: Only return entries of this action type
             
         Returns:
             List of action log entries
         """
-        if limit:
-            return self.action_log[-limit:]
-        return self.action_log
+        return self.action_log.get(limit, service_name=service_name, action=action)
     
     def reset(self):
         """Reset environment to initial state"""
+        self.rng.seed(self.seed)
         for service in self.services.values():
             service.status = ServiceStatus.RUNNING
-            service.cpu_usage = random.uniform(10, 30)
-            service.memory_usage = random.uniform(20, 40)
+            service.cpu_usage = self.rng.uniform(10, 30)
+            service.memory_usage = self.rng.uniform(20, 40)
             service.restart_count = 0
             service.last_restart = None
-        self.action_log = []
-
+        self.action_log.clear()
+        self._events = []
+        self._state_changed()
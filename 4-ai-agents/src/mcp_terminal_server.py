@@ -1,6 +1,20 @@
-import subprocess
+import argparse
+import asyncio
+import contextlib
+import hmac
 import json
-from typing import Any
+import multiprocessing
+import os
+import pwd
+import selectors
+import shlex
+import signal
+import socket
+import subprocess
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -15,14 +29,611 @@ SAFE_COMMANDS = {
     "cat", "head", "tail", "grep", "find",
     "echo", "uname", "hostname", "env"
 }
+# find actions that run other programs or write/delete files
+UNSAFE_FIND_ACTIONS = ("-exec", "-execdir", "-ok", "-okdir", "-delete", "-fls", "-fprint")
+
+# Command execution limits
+COMMAND_TIMEOUT = 10  # seconds
+MAX_CONCURRENT_COMMANDS = int(os.getenv("MCP_MAX_CONCURRENT_COMMANDS", "4"))
+_command_slots = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+# Output limits: larger output keeps its head and tail around an elision marker
+MAX_OUTPUT_BYTES = int(os.getenv("MCP_MAX_OUTPUT_BYTES", str(64 * 1024)))
+MAX_OUTPUT_LINES = int(os.getenv("MCP_MAX_OUTPUT_LINES", "1000"))
+# Split responses into TextContent chunks of this many characters (0 = one chunk)
+OUTPUT_CHUNK_SIZE = int(os.getenv("MCP_OUTPUT_CHUNK_SIZE", "0"))
+READ_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 1.0  # seconds between progress notifications
+
+# Opt-in result cache for idempotent commands (set MCP_COMMAND_CACHE=1)
+COMMAND_CACHE_ENABLED = os.getenv("MCP_COMMAND_CACHE", "").lower() in ("1", "true", "yes")
+COMMAND_CACHE_SIZE = 256
+# Seconds a successful result is reused, per command; commands not listed are never cached
+COMMAND_CACHE_TTLS = {
+    "uname": 3600.0,
+    "hostname": 3600.0,
+    "whoami": 3600.0,
+    "env": 60.0,
+    "df": 10.0,
+    "free": 5.0,
+    "uptime": 5.0,
+}
+_command_cache: Dict[Tuple[str, ...], Tuple[float, Tuple[int, "BoundedOutput", "BoundedOutput"]]] = {}
+_inflight_commands: Dict[Tuple[str, ...], asyncio.Future] = {}
+
+# Answer simple commands in-process instead of spawning a process (set MCP_NATIVE_COMMANDS=0 to disable)
+NATIVE_COMMANDS_ENABLED = os.getenv("MCP_NATIVE_COMMANDS", "1").lower() not in ("0", "false", "no")
 
 def is_safe_command(command: str) -> bool:
     """Check if command is in the safe whitelist."""
-    cmd_parts = command.strip().split()
+    try:
+        cmd_parts = shlex.split(command)
+    except ValueError:
+        return False
     if not cmd_parts:
         return False
-    base_cmd = cmd_parts[0]
-    return base_cmd in SAFE_COMMANDS
+    base_cmd, args = cmd_parts[0], cmd_parts[1:]
+    if base_cmd not in SAFE_COMMANDS:
+        return False
+    # Only the first word is whitelisted, so reject arguments that make a
+    # whitelisted command run something else
+    if base_cmd == "env":
+        # "env <command>" runs <command>; only plain env (list variables) is allowed
+        return not args
+    if base_cmd == "find":
+        # Prefix match also covers -fprint0 / -fprintf
+        return not any(arg.startswith(UNSAFE_FIND_ACTIONS) for arg in args)
+    return True
+
+def _kill(process: asyncio.subprocess.Process):
+    """Kill a command and any children it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+class BoundedOutput:
+    """
+    Collects command output incrementally with bounded memory.
+    
+    The first half of the byte/line budget is kept as the head and the
+    last half as a rolling tail; anything in between is dropped and
+    replaced by an elision marker when rendered.
+    """
+    
+    def __init__(self, max_bytes: int = None, max_lines: int = None):
+        max_bytes = MAX_OUTPUT_BYTES if max_bytes is None else max_bytes
+        max_lines = MAX_OUTPUT_LINES if max_lines is None else max_lines
+        self.head_bytes = max_bytes // 2
+        self.head_lines = max_lines // 2
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.tail_lines = max_lines - self.head_lines
+        self.total_bytes = 0
+        self.total_lines = 0
+        self._head = bytearray()
+        self._head_line_count = 0
+        self._head_full = False
+        self._tail = deque()  # pieces, each ending with a newline except possibly the last
+        self._tail_size = 0
+    
+    def feed(self, data: bytes):
+        """Add a chunk of output."""
+        self.total_bytes += len(data)
+        self.total_lines += data.count(b"\n")
+        if not self._head_full:
+            data = self._feed_head(data)
+        if data:
+            self._feed_tail(data)
+    
+    def _feed_head(self, data: bytes) -> bytes:
+        """Fill the head; returns the part of data that did not fit."""
+        take = data[:self.head_bytes - len(self._head)]
+        lines_room = self.head_lines - self._head_line_count
+        end = -1
+        for _ in range(lines_room):
+            end = take.find(b"\n", end + 1)
+            if end == -1:
+                break
+        else:
+            # Line budget reached inside this chunk
+            take = take[:end + 1] if lines_room > 0 else b""
+        
+        self._head += take
+        self._head_line_count += take.count(b"\n")
+        if len(take) < len(data):
+            self._head_full = True
+        return data[len(take):]
+    
+    def _feed_tail(self, data: bytes):
+        """Append to the rolling tail, dropping its oldest lines when over budget."""
+        pieces = [line + b"\n" for line in data.split(b"\n")]
+        pieces[-1] = pieces[-1][:-1]
+        if not pieces[-1]:
+            pieces.pop()
+        if self._tail and not self._tail[-1].endswith(b"\n"):
+            first = pieces.pop(0)
+            self._tail_size += len(first)
+            self._tail[-1] += first
+        for piece in pieces:
+            self._tail.append(piece)
+            self._tail_size += len(piece)
+        
+        while self._tail and (self._tail_size > self.tail_bytes or len(self._tail) > self.tail_lines):
+            if len(self._tail) > 1 or self.tail_lines == 0:
+                self._tail_size -= len(self._tail.popleft())
+            else:
+                # A single line longer than the budget: keep its end
+                piece = self._tail[0][-self.tail_bytes:] if self.tail_bytes else b""
+                self._tail_size = len(piece)
+                self._tail[0] = piece
+                if not piece:
+                    self._tail.clear()
+                break
+    
+    @property
+    def truncated(self) -> bool:
+        """Whether some output was dropped."""
+        return self.total_bytes > len(self._head) + self._tail_size
+    
+    def render(self) -> str:
+        """Decode the kept output, with an elision marker if some was dropped."""
+        tail = b"".join(self._tail)
+        if not self.truncated:
+            return (bytes(self._head) + tail).decode("utf-8", errors="replace")
+        
+        omitted_bytes = self.total_bytes - len(self._head) - len(tail)
+        omitted_lines = self.total_lines - self._head_line_count - tail.count(b"\n")
+        marker = f"\n... [{omitted_bytes} bytes, {omitted_lines} lines omitted] ...\n"
+        return (
+            self._head.decode("utf-8", errors="replace")
+            + marker
+            + tail.decode("utf-8", errors="replace")
+        )
+
+async def _read_stream(
+    stream: asyncio.StreamReader,
+    output: BoundedOutput,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+):
+    """Read a stream to the end into a BoundedOutput."""
+    last_report = time.monotonic()
+    while True:
+        data = await stream.read(READ_SIZE)
+        if not data:
+            return
+        output.feed(data)
+        if on_progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+            last_report = time.monotonic()
+            await on_progress(output.total_bytes)
+
+# Marks a CommandWorkerPool slot whose call was cancelled before its command started
+_SLOT_CANCELLED = -1
+
+# The pool's slot table (set in pool workers by _init_worker)
+_worker_slots = None
+
+def _init_worker(slots):
+    global _worker_slots
+    _worker_slots = slots
+
+def _publish_process(slot: Optional[int], process: subprocess.Popen):
+    """Record a worker's command in its slot, or kill it if the call was already cancelled."""
+    if slot is None or _worker_slots is None:
+        return
+    with _worker_slots.get_lock():
+        cancelled = _worker_slots[slot] == _SLOT_CANCELLED
+        if not cancelled:
+            _worker_slots[slot] = process.pid
+    if cancelled:
+        _kill(process)
+
+def _clear_slot(slot: Optional[int]):
+    if slot is None or _worker_slots is None:
+        return
+    with _worker_slots.get_lock():
+        _worker_slots[slot] = 0
+
+def _run_in_worker(
+    argv: List[str],
+    timeout: float,
+    max_bytes: int,
+    max_lines: int,
+    slot: Optional[int] = None
+) -> Tuple[int, BoundedOutput, BoundedOutput]:
+    """
+    Run a command inside a pool worker process (blocking, with the same limits as run_command).
+    
+    While the command runs its pid (which is also its process group) is
+    published in the pool's slot table, so the server can kill it when the
+    call is cancelled. The slot is cleared before the process is reaped,
+    so the server never signals a pid that may have been reused.
+    """
+    stdout = BoundedOutput(max_bytes, max_lines)
+    stderr = BoundedOutput(max_bytes, max_lines)
+    deadline = time.monotonic() + timeout
+    process = subprocess.Popen(
+        argv,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    _publish_process(slot, process)
+    outputs = {process.stdout: stdout, process.stderr: stderr}
+    # Becomes readable when the process exits, without reaping it (Linux)
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        pidfd = None
+    try:
+        with selectors.DefaultSelector() as selector:
+            for stream in outputs:
+                selector.register(stream, selectors.EVENT_READ)
+            if pidfd is not None:
+                selector.register(pidfd, selectors.EVENT_READ)
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError
+                for key, _ in selector.select(remaining):
+                    if key.fileobj == pidfd:
+                        selector.unregister(pidfd)
+                        continue
+                    data = os.read(key.fd, READ_SIZE)
+                    if data:
+                        outputs[key.fileobj].feed(data)
+                    else:
+                        selector.unregister(key.fileobj)
+        if pidfd is not None:
+            _clear_slot(slot)
+        process.wait(timeout=max(0.0, deadline - time.monotonic()))
+    except (TimeoutError, subprocess.TimeoutExpired):
+        _kill(process)
+        _clear_slot(slot)
+        process.wait()
+        raise TimeoutError(f"Command timed out after {timeout} seconds")
+    finally:
+        _clear_slot(slot)
+        if pidfd is not None:
+            os.close(pidfd)
+        process.stdout.close()
+        process.stderr.close()
+    return process.returncode, stdout, stderr
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+class CommandWorkerPool:
+    """
+    Pool of pre-forked worker processes that execute commands.
+    
+    The workers are started up front (before the server accepts clients),
+    so the long-lived server process does not fork for every command and
+    a slow command never runs on the event loop's process.
+    
+    Each call takes a slot in a table shared with the workers, where the
+    worker publishes the pid of the command it runs; a cancelled call kills
+    that command's process group, as run_command does in-process.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        # pid of the command running for each slot (0 = none yet, or done)
+        self._slots = multiprocessing.Array("i", size * 2)
+        self._free_slots = list(range(len(self._slots)))
+        self._slot_owners: List[Optional[object]] = [None] * len(self._slots)
+        self._executor = ProcessPoolExecutor(
+            max_workers=size,
+            initializer=_init_worker,
+            initargs=(self._slots,)
+        )
+    
+    def start(self):
+        """Start all workers now instead of on first use."""
+        wait([self._executor.submit(_worker_ready) for _ in range(self.size)])
+    
+    async def run(
+        self,
+        argv: List[str],
+        timeout: float,
+        max_bytes: Optional[int] = None,
+        max_lines: Optional[int] = None
+    ) -> Tuple[int, BoundedOutput, BoundedOutput]:
+        """
+        Run a command on a worker; the worker enforces the timeout.
+        
+        If the call is cancelled, the command is killed (or never started)
+        and the call returns once the worker is free again.
+        """
+        loop = asyncio.get_running_loop()
+        owner = object()
+        slot = self._take_slot(owner)
+        future = self._executor.submit(
+            _run_in_worker,
+            argv,
+            timeout,
+            MAX_OUTPUT_BYTES if max_bytes is None else max_bytes,
+            MAX_OUTPUT_LINES if max_lines is None else max_lines,
+            slot,
+        )
+        if slot is not None:
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._free_slot, slot))
+        try:
+            return await asyncio.wrap_future(future)
+        except TimeoutError:
+            raise asyncio.TimeoutError()
+        except asyncio.CancelledError:
+            self._cancel(slot, owner)
+            # Hold the caller's command slot until the worker is free again
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await asyncio.shield(asyncio.wrap_future(future))
+            raise
+    
+    def _take_slot(self, owner: object) -> Optional[int]:
+        """Reserve a slot for one call (None if all are busy: the call then cannot be killed)."""
+        if not self._free_slots:
+            return None
+        slot = self._free_slots.pop()
+        self._slot_owners[slot] = owner
+        with self._slots.get_lock():
+            self._slots[slot] = 0
+        return slot
+    
+    def _free_slot(self, slot: int):
+        self._slot_owners[slot] = None
+        self._free_slots.append(slot)
+    
+    def _cancel(self, slot: Optional[int], owner: object):
+        """Kill the command of a cancelled call, or keep it from starting."""
+        # The call may have finished (and its slot been reused) already
+        if slot is None or self._slot_owners[slot] is not owner:
+            return
+        with self._slots.get_lock():
+            pid = self._slots[slot]
+            if pid > 0:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            else:
+                self._slots[slot] = _SLOT_CANCELLED
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Set by main() when the server runs with --workers
+_worker_pool: Optional[CommandWorkerPool] = None
+
+async def run_command(
+    command: str,
+    timeout: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+    max_lines: Optional[int] = None,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+) -> Tuple[int, BoundedOutput, BoundedOutput]:
+    """
+    Run a command without a shell and without blocking the event loop.
+    
+    At most MAX_CONCURRENT_COMMANDS commands run at once. On timeout or
+    cancellation the command (and its process group) is killed. Output is
+    read incrementally and capped at max_bytes / max_lines per stream.
+    With a worker pool, the command runs on a pool worker instead (which
+    enforces the timeout itself and is told to kill the command on
+    cancellation; progress is not reported).
+    
+    Returns:
+        (return code, stdout, stderr)
+    """
+    if timeout is None:
+        timeout = COMMAND_TIMEOUT
+    args = shlex.split(command)
+    if _worker_pool is not None:
+        async with _command_slots:
+            return await _worker_pool.run(args, timeout, max_bytes, max_lines)
+    
+    stdout = BoundedOutput(max_bytes, max_lines)
+    stderr = BoundedOutput(max_bytes, max_lines)
+    async with _command_slots:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        readers = asyncio.gather(
+            _read_stream(process.stdout, stdout, on_progress),
+            _read_stream(process.stderr, stderr),
+            process.wait(),
+        )
+        # Consume the readers' error if they get cancelled along with us
+        readers.add_done_callback(lambda future: future.cancelled() or future.exception())
+        try:
+            await asyncio.wait_for(readers, timeout)
+        except BaseException:
+            # Timed out or cancelled: don't leave the command running
+            _kill(process)
+            await asyncio.shield(process.wait())
+            raise
+    return process.returncode, stdout, stderr
+
+async def run_cached_command(
+    command: str,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+) -> Tuple[int, BoundedOutput, BoundedOutput]:
+    """
+    Run a command, reusing a recent result for cacheable commands.
+    
+    The cache is keyed on the normalized argv, so "df  -h" and "df -h" share
+    an entry. Only successful runs are cached, for COMMAND_CACHE_TTLS[command]
+    seconds. Identical cacheable commands that arrive while one is running
+    wait for that run instead of spawning another process.
+    
+    Returns:
+        (return code, stdout, stderr)
+    """
+    argv = tuple(shlex.split(command))
+    ttl = COMMAND_CACHE_TTLS.get(argv[0]) if COMMAND_CACHE_ENABLED and argv else None
+    if not ttl:
+        return await run_command(command, on_progress=on_progress)
+    
+    now = time.monotonic()
+    entry = _command_cache.get(argv)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    inflight = _inflight_commands.get(argv)
+    if inflight is not None:
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The run we were waiting for was cancelled; run it ourselves
+            return await run_command(command, on_progress=on_progress)
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight_commands[argv] = future
+    try:
+        result = await run_command(command, on_progress=on_progress)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved when nobody else was waiting
+        raise
+    finally:
+        del _inflight_commands[argv]
+    future.set_result(result)
+    
+    if result[0] == 0:
+        _command_cache.pop(argv, None)
+        _command_cache[argv] = (time.monotonic() + ttl, result)
+        while len(_command_cache) > COMMAND_CACHE_SIZE:
+            del _command_cache[next(iter(_command_cache))]
+    return result
+
+def _native_pwd(args: List[str]) -> Optional[str]:
+    if args:
+        return None
+    return os.getcwd() + "\n"
+
+def _native_echo(args: List[str]) -> Optional[str]:
+    if args and args[0].startswith("-"):
+        return None  # Options (-n, -e, --help, ...) are left to the real echo
+    return " ".join(args) + "\n"
+
+def _native_hostname(args: List[str]) -> Optional[str]:
+    if args:
+        return None
+    return socket.gethostname() + "\n"
+
+def _native_whoami(args: List[str]) -> Optional[str]:
+    if args:
+        return None
+    return pwd.getpwuid(os.geteuid()).pw_name + "\n"
+
+def _native_uname(args: List[str]) -> Optional[str]:
+    # Supports -s/-n/-r/-v/-m (combinable); uname prints fields in this fixed order
+    fields = "snrvm"
+    flags = set()
+    for arg in args:
+        if not arg.startswith("-") or arg.startswith("--") or len(arg) < 2:
+            return None
+        for flag in arg[1:]:
+            if flag not in fields:
+                return None
+            flags.add(flag)
+    flags = flags or {"s"}
+    info = os.uname()
+    values = {
+        "s": info.sysname,
+        "n": info.nodename,
+        "r": info.release,
+        "v": info.version,
+        "m": info.machine,
+    }
+    return " ".join(values[flag] for flag in fields if flag in flags) + "\n"
+
+def _native_date(args: List[str]) -> Optional[str]:
+    if args:
+        return None
+    # The default format only matches date's output in the C locale
+    for name in ("LC_ALL", "LC_TIME", "LANG"):
+        value = os.environ.get(name)
+        if value:
+            if value not in ("C", "POSIX", "C.UTF-8", "C.utf8"):
+                return None
+            break
+    return time.strftime("%a %b %e %H:%M:%S %Z %Y") + "\n"
+
+def _native_env(args: List[str]) -> Optional[str]:
+    if args:
+        return None
+    return "".join(f"{key}={value}\n" for key, value in os.environ.items())
+
+# In-process handlers: take the arguments, return stdout or None to fall back to exec
+NATIVE_COMMANDS: Dict[str, Callable[[List[str]], Optional[str]]] = {
+    "pwd": _native_pwd,
+    "echo": _native_echo,
+    "hostname": _native_hostname,
+    "whoami": _native_whoami,
+    "uname": _native_uname,
+    "date": _native_date,
+    "env": _native_env,
+}
+
+def run_native_command(command: str) -> Optional[Tuple[int, BoundedOutput, BoundedOutput]]:
+    """
+    Answer a command in-process if a native handler supports its arguments.
+    
+    Returns:
+        (return code, stdout, stderr), or None if the command must be executed
+    """
+    if not NATIVE_COMMANDS_ENABLED:
+        return None
+    argv = shlex.split(command)
+    handler = NATIVE_COMMANDS.get(argv[0]) if argv else None
+    if handler is None:
+        return None
+    try:
+        output = handler(argv[1:])
+    except Exception:
+        return None  # Let the real command produce the answer (or the error)
+    if output is None:
+        return None
+    
+    stdout = BoundedOutput()
+    stdout.feed(output.encode("utf-8", errors="replace"))
+    return 0, stdout, BoundedOutput()
+
+def _progress_reporter() -> Optional[Callable[[int], Awaitable[None]]]:
+    """Build a progress callback if the client asked for progress notifications."""
+    try:
+        context = mcp_server.request_context
+    except (LookupError, AttributeError):
+        return None
+    token = getattr(context.meta, "progressToken", None) if context.meta else None
+    if token is None:
+        return None
+    
+    async def report(bytes_read: int):
+        await context.session.send_progress_notification(token, bytes_read)
+    
+    return report
+
+def _chunk_text(text: str) -> list[TextContent]:
+    """Split a response into TextContent chunks of OUTPUT_CHUNK_SIZE characters."""
+    if OUTPUT_CHUNK_SIZE <= 0 or len(text) <= OUTPUT_CHUNK_SIZE:
+        return [TextContent(type="text", text=text)]
+    return [
+        TextContent(type="text", text=text[start:start + OUTPUT_CHUNK_SIZE])
+        for start in range(0, len(text), OUTPUT_CHUNK_SIZE)
+    ]
 
 @mcp_server.list_tools()
 async def list_tools() -> list[Tool]:
@@ -53,39 +664,229 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         if not command:
             return [TextContent(type="text", text="Error: No command provided")]
         
+        try:
+            shlex.split(command)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Error: Could not parse command: {e}")]
+        
         if not is_safe_command(command):
+            base_cmd = command.split()[0]
+            if base_cmd in SAFE_COMMANDS:
+                return [TextContent(
+                    type="text",
+                    text=f"Error: These arguments to '{base_cmd}' are not allowed (they can run other commands or modify files)"
+                )]
             return [TextContent(
                 type="text",
-                text=f"Error: Command '{command.split()[0]}' is not in the safe whitelist. Allowed commands: {', '.join(sorted(SAFE_COMMANDS))}"
+                text=f"Error: Command '{base_cmd}' is not in the safe whitelist. Allowed commands: {', '.join(sorted(SAFE_COMMANDS))}"
             )]
         
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
+            result = run_native_command(command)
+            if result is None:
+                result = await run_cached_command(command, on_progress=_progress_reporter())
+            return_code, stdout, stderr = result
             
-            output = result.stdout if result.stdout else result.stderr
-            return_code = result.returncode
+            output = stdout if stdout.total_bytes else stderr
             
             response = f"Command: {command}\n"
             response += f"Return code: {return_code}\n"
-            response += f"Output:\n{output}"
+            if output.truncated:
+                response += f"Output truncated: {output.total_bytes} bytes, {output.total_lines} lines in total\n"
+            response += f"Output:\n{output.render()}"
             
-            return [TextContent(type="text", text=response)]
+            return _chunk_text(response)
             
-        except subprocess.TimeoutExpired:
-            return [TextContent(type="text", text=f"Error: Command '{command}' timed out after 10 seconds")]
+        except asyncio.TimeoutError:
+            return [TextContent(type="text", text=f"Error: Command '{command}' timed out after {COMMAND_TIMEOUT} seconds")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error executing command: {str(e)}")]
     
     return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-async def main():
-    """Run the MCP server."""
+class TokenBucket:
+    """Token bucket allowing rate requests per second with bursts of up to burst."""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def take(self) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+async def _send_error(send, status: int, body: Dict[str, Any], headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    """Send a JSON error response from ASGI middleware."""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json")] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+class BearerAuthMiddleware:
+    """
+    ASGI middleware requiring "Authorization: Bearer <token>" on every HTTP
+    request (SSE stream and messages alike); others get 401.
+    """
+    
+    def __init__(self, app, token: str):
+        if not token:
+            raise ValueError("An auth token is required")
+        self.app = app
+        self._expected = f"Bearer {token}".encode()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        authorization = b""
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                authorization = value
+                break
+        if hmac.compare_digest(authorization, self._expected):
+            await self.app(scope, receive, send)
+            return
+        await _send_error(send, 401, {"error": "Unauthorized"}, [(b"www-authenticate", b"Bearer")])
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying a per-client token bucket to POST requests
+    (the MCP messages); the long-lived SSE stream itself is not limited.
+    
+    Clients are identified by their remote address. Behind a trusted proxy
+    that sets X-Client-Id, pass trust_client_id=True to key on that header
+    instead (never do this when clients connect directly: they could pick
+    a new ID per request). Requests over the limit get 429 with Retry-After.
+    """
+    
+    def __init__(
+        self,
+        app,
+        rate: float,
+        burst: float,
+        max_clients: int = 10000,
+        trust_client_id: bool = False
+    ):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.trust_client_id = trust_client_id
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+    
+    def _client_id(self, scope) -> str:
+        if self.trust_client_id:
+            for name, value in scope.get("headers", []):
+                if name == b"x-client-id" and value:
+                    return "id:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "addr:" + client[0] if client else "unknown"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        client_id = self._client_id(scope)
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(client_id)
+        
+        retry_after = bucket.take()
+        if retry_after == 0:
+            await self.app(scope, receive, send)
+            return
+        
+        await _send_error(
+            send,
+            429,
+            {"error": "Rate limit exceeded", "retry_after": retry_after},
+            [(b"retry-after", str(max(1, round(retry_after))).encode())]
+        )
+
+def create_http_app(
+    transport: str,
+    auth_token: str,
+    rate_limit: float = 0.0,
+    burst: Optional[float] = None,
+    trust_client_id: bool = False
+):
+    """
+    Build the ASGI app for an HTTP transport.
+    
+    Args:
+        transport: "sse" (GET /sse + POST /messages/) or "streamable-http" (/mcp)
+        auth_token: Bearer token every request must carry (required)
+        rate_limit: Requests per second allowed per client (0 = unlimited)
+        burst: Bucket size for bursts (default: max(1, rate_limit))
+        trust_client_id: Rate-limit by X-Client-Id (only behind a trusted proxy)
+    """
+    if not auth_token:
+        raise ValueError("HTTP transports require an auth token (set MCP_AUTH_TOKEN)")
+    
+    try:
+        from starlette.applications import Starlette
+        from starlette.responses import Response
+        from starlette.routing import Mount, Route
+    except ImportError:
+        raise ImportError(
+            "HTTP transports need starlette and uvicorn (installed with mcp). Install them with: pip install mcp"
+        )
+    
+    if transport == "sse":
+        from mcp.server.sse import SseServerTransport
+        
+        sse = SseServerTransport("/messages/")
+        
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+            return Response()
+        
+        app = Starlette(routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ])
+    else:
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        
+        session_manager = StreamableHTTPSessionManager(app=mcp_server, event_store=None)
+        
+        async def handle_streamable_http(scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with session_manager.run():
+                yield
+        
+        app = Starlette(routes=[Mount("/mcp", app=handle_streamable_http)], lifespan=lifespan)
+    
+    if rate_limit > 0:
+        app = RateLimitMiddleware(
+            app,
+            rate_limit,
+            burst if burst is not None else max(1.0, rate_limit),
+            trust_client_id=trust_client_id
+        )
+    return BearerAuthMiddleware(app, auth_token)
+
+async def serve_stdio():
+    """Run the MCP server over stdio (one client per process)."""
     async with stdio_server() as (read_stream, write_stream):
         await mcp_server.run(
             read_stream,
@@ -93,7 +894,53 @@ async def main():
             mcp_server.create_initialization_options()
         )
 
-if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
+def main(argv: Optional[List[str]] = None):
+    """Run the MCP server."""
+    global _command_slots, _worker_pool
+    
+    parser = argparse.ArgumentParser(description="Terminal MCP server")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"],
+                        default=os.getenv("MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_WORKERS", "0")),
+                        help="Pre-forked command worker processes (0 = run commands from the server process)")
+    parser.add_argument("--rate-limit", type=float, default=float(os.getenv("MCP_RATE_LIMIT", "0")),
+                        help="Requests per second per client on HTTP transports (0 = unlimited)")
+    parser.add_argument("--burst", type=float, default=None,
+                        help="Burst size for --rate-limit (default: max(1, rate limit))")
+    parser.add_argument("--trust-client-id", action="store_true",
+                        default=os.getenv("MCP_TRUST_CLIENT_ID", "").lower() in ("1", "true", "yes"),
+                        help="Rate-limit by the X-Client-Id header; only behind a trusted proxy that sets it")
+    args = parser.parse_args(argv)
+    
+    # Read from the environment only, so the token does not show up in ps
+    auth_token = os.getenv("MCP_AUTH_TOKEN", "")
+    if args.transport != "stdio" and not auth_token:
+        parser.error("HTTP transports run commands for anyone who can connect; set MCP_AUTH_TOKEN to require a bearer token")
+    
+    if args.workers > 0:
+        # Fork the workers before the server starts any threads or event loop
+        _worker_pool = CommandWorkerPool(args.workers)
+        _worker_pool.start()
+        _command_slots = asyncio.Semaphore(args.workers)
+    
+    try:
+        if args.transport == "stdio":
+            asyncio.run(serve_stdio())
+        else:
+            import uvicorn
+            app = create_http_app(
+                args.transport,
+                auth_token,
+                args.rate_limit,
+                args.burst,
+                trust_client_id=args.trust_client_id
+            )
+            uvicorn.run(app, host=args.host, port=args.port)
+    finally:
+        if _worker_pool is not None:
+            _worker_pool.shutdown()
 
+if __name__ == "__main__":
+    main()
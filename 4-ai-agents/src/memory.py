@@ -5,15 +5,30 @@ This module provides memory capabilities for agents to learn from
 past experiences and improve over time.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, Iterator, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import deque
+from itertools import islice
 import json
+import os
+import sys
 
+# Handle both relative and absolute imports
+try:
+    from .similarity import LexicalIndex, SimilarityIndex
+except ImportError:
+    from similarity import LexicalIndex, SimilarityIndex
 
-@dataclass
+
+@dataclass(slots=True)
 class ActionMemory:
-    """Memory of a single action taken by the agent"""
+    """
+    Memory of a single action taken by the agent
+    
+    Slotted (no per-instance __dict__) and with action_type interned, since
+    long-running agents keep very many of these.
+    """
     timestamp: float
     action_type: str
     action_params: Dict[str, Any]
@@ -21,6 +36,10 @@ class ActionMemory:
     success: bool
     context: str = ""
     
+    def __post_init__(self):
+        # Few distinct action types: share one string object per type
+        self.action_type = sys.intern(self.action_type)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
@@ -31,9 +50,14 @@ class ActionMemory:
             "success": self.success,
             "context": self.context
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ActionMemory":
+        """Create from dictionary"""
+        return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProblemMemory:
     """Memory of a problem and its solution"""
     problem_description: str
@@ -46,11 +70,91 @@ class ProblemMemory:
         """Convert to dictionary"""
         return {
             "problem_description": self.problem_description,
+            # One small dict per action; their params/result dicts are shared, not copied
             "solution_actions": [action.to_dict() for action in self.solution_actions],
             "success": self.success,
             "timestamp": self.timestamp,
             "notes": self.notes
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProblemMemory":
+        """Create from dictionary"""
+        return cls(
+            problem_description=data["problem_description"],
+            solution_actions=[
+                ActionMemory.from_dict(action_data)
+                for action_data in data["solution_actions"]
+            ],
+            success=data["success"],
+            timestamp=data["timestamp"],
+            notes=data.get("notes", "")
+        )
+
+
+def iter_journal(filepath: str) -> Iterator[Union[ActionMemory, ProblemMemory]]:
+    """
+    Lazily read records from a memory journal (JSONL) file.
+    
+    Records are yielded one at a time, so a journal can be scanned without
+    loading it into memory. A truncated last line (e.g. from a crash
+    mid-write) is skipped.
+    
+    Args:
+        filepath: Path to the journal file
+        
+    Yields:
+        ActionMemory and ProblemMemory records, in the order they were written
+    """
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            
+            kind = record.pop("type", None)
+            if kind == "action":
+                yield ActionMemory.from_dict(record)
+            elif kind == "problem":
+                yield ProblemMemory.from_dict(record)
+
+
+class _ActionHistory(deque):
+    """
+    Deque of actions that also supports list-style slicing and comparison
+    with lists, so code written against the former list attribute (e.g.
+    memory.action_history[-5:]) keeps working. Slices are returned as lists.
+    """
+    
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return super().__getitem__(index)
+        
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            return list(self)[index]
+        if stop <= start:
+            return []
+        if start > len(self) - stop:
+            # Closer to the right end: walk from there
+            items = list(islice(reversed(self), len(self) - stop, len(self) - start))
+            items.reverse()
+            return items
+        return list(islice(self, start, stop))
+    
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return list(self) == other
+        return super().__eq__(other)
+    
+    def __ne__(self, other):
+        return not self == other
+    
+    __hash__ = None
 
 
 class AgentMemory:
@@ -59,13 +163,130 @@ class AgentMemory:
     
     Stores past experiences, successful solutions, and learned patterns
     to help agents make better decisions over time.
+    
+    Action statistics are kept as running counters, so they never scan the
+    history. With max_actions set, the oldest actions are evicted once the
+    history is full (the statistics then describe the retained actions).
+    
+    action_history is a deque (with list-style slicing) so eviction is
+    O(1). Record actions and problems with remember_action() and
+    remember_problem_solution(): appending to action_history or
+    problem_solutions directly bypasses the counters, max_actions, the
+    journal and the similarity index (call rebuild_index() after editing
+    problem_solutions by hand).
     """
     
-    def __init__(self):
-        """Initialize agent memory"""
-        self.action_history: List[ActionMemory] = []
-        self.problem_solutions: List[ProblemMemory] = []
+    def __init__(
+        self,
+        similarity_index: Optional[SimilarityIndex] = None,
+        journal_path: Optional[str] = None,
+        journal_fsync: bool = False,
+        max_actions: Optional[int] = None
+    ):
+        """
+        Initialize agent memory
+        
+        Args:
+            similarity_index: Index used by get_similar_problems (default: LexicalIndex)
+            journal_path: Optional append-only JSONL journal; existing records
+                are loaded and every new action/problem is appended to it
+            journal_fsync: Whether to fsync the journal after every record
+            max_actions: Maximum number of actions retained (None = unbounded)
+        """
+        if max_actions is not None and max_actions < 1:
+            raise ValueError("max_actions must be at least 1")
+        
+        self.max_actions = max_actions
         self.successful_patterns: Dict[str, List[Dict[str, Any]]] = {}
+        self.similarity_index = similarity_index if similarity_index is not None else LexicalIndex()
+        self._reset()
+        
+        self.journal_path = journal_path
+        self.journal_fsync = journal_fsync
+        self._journal = None
+        if journal_path:
+            if os.path.exists(journal_path):
+                self.load_journal(journal_path)
+            self._open_journal()
+    
+    def _reset(self):
+        """Empty the in-memory state"""
+        self.action_history: Deque[ActionMemory] = _ActionHistory()
+        self.problem_solutions: List[ProblemMemory] = []
+        self.similarity_index.clear()
+        # action_type -> [total, successful]
+        self._action_counts: Dict[str, List[int]] = {}
+        self._successful_actions = 0
+        self._solved_problems = 0
+    
+    def _count_action(self, memory: ActionMemory, delta: int):
+        """Add (delta=1) or remove (delta=-1) an action from the counters"""
+        counts = self._action_counts.get(memory.action_type)
+        if counts is None:
+            counts = self._action_counts[memory.action_type] = [0, 0]
+        counts[0] += delta
+        if memory.success:
+            counts[1] += delta
+            self._successful_actions += delta
+        if counts[0] == 0:
+            del self._action_counts[memory.action_type]
+    
+    def _add_action(self, memory: ActionMemory):
+        """Add an action record to in-memory state, evicting the oldest if full"""
+        if self.max_actions is not None and len(self.action_history) >= self.max_actions:
+            self._count_action(self.action_history.popleft(), -1)
+        self.action_history.append(memory)
+        self._count_action(memory, 1)
+    
+    def _add_problem(self, memory: ProblemMemory):
+        """Add a problem record to in-memory state"""
+        self.problem_solutions.append(memory)
+        self.similarity_index.add(memory.problem_description)
+        if memory.success:
+            self._solved_problems += 1
+    
+    def _replace_contents(self, actions: List[ActionMemory], problems: List[ProblemMemory]):
+        """Replace the in-memory state with already parsed records"""
+        self._reset()
+        for action in actions:
+            self._add_action(action)
+        for problem in problems:
+            self._add_problem(problem)
+        # Rewrite an open journal, or the next restart would replay the
+        # records it held before instead of the loaded state
+        if self._journal is not None:
+            self.compact()
+    
+    def _open_journal(self):
+        """Open the journal for appending"""
+        # Terminate a truncated last line so new records start on a fresh line
+        needs_newline = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+        
+        self._journal = open(self.journal_path, 'a')
+        if needs_newline:
+            self._journal.write("\n")
+            self._journal.flush()
+    
+    def _journal_line(self, kind: str, record: Dict[str, Any]) -> Optional[str]:
+        """Serialize one record for the journal (None if the journal is disabled)"""
+        if self._journal is None:
+            return None
+        return json.dumps({"type": kind, **record}) + "\n"
+    
+    def _append_to_journal(self, line: Optional[str]):
+        """Append one serialized record to the journal (if enabled)"""
+        if line is None:
+            return
+        self._journal.write(line)
+        self._journal.flush()
+        if self.journal_fsync:
+            os.fsync(self._journal.fileno())
     
     def remember_action(
         self,
@@ -94,7 +315,11 @@ class AgentMemory:
             success=success,
             context=context
         )
-        self.action_history.append(memory)
+        # Serialize first: a record the journal cannot hold (e.g. a result
+        # that is not JSON-serializable) must not reach memory either
+        line = self._journal_line("action", memory.to_dict())
+        self._add_action(memory)
+        self._append_to_journal(line)
     
     def remember_problem_solution(
         self,
@@ -121,7 +346,9 @@ class AgentMemory:
             timestamp=time.time(),
             notes=notes
         )
-        self.problem_solutions.append(memory)
+        line = self._journal_line("problem", memory.to_dict())
+        self._add_problem(memory)
+        self._append_to_journal(line)
     
     def get_similar_problems(self, problem_description: str, limit: int = 5) -> List[ProblemMemory]:
         """
@@ -134,18 +361,14 @@ class AgentMemory:
         Returns:
             List of similar problems
         """
-        # Simple keyword matching (in production, would use embeddings/semantic search)
-        keywords = set(problem_description.lower().split())
-        
-        scored_problems = []
+        matches = self.similarity_index.search(problem_description, limit)
+        return [self.problem_solutions[position] for _, position in matches]
+    
+    def rebuild_index(self):
+        """Rebuild the similarity index from problem_solutions."""
+        self.similarity_index.clear()
         for problem in self.problem_solutions:
-            problem_keywords = set(problem.problem_description.lower().split())
-            similarity = len(keywords & problem_keywords) / max(len(keywords | problem_keywords), 1)
-            scored_problems.append((similarity, problem))
-        
-        # Sort by similarity and return top matches
-        scored_problems.sort(reverse=True, key=lambda x: x[0])
-        return [problem for _, problem in scored_problems[:limit]]
+            self.similarity_index.add(problem.problem_description)
     
     def get_action_statistics(self, action_type: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -157,11 +380,12 @@ class AgentMemory:
         Returns:
             Dictionary with statistics
         """
-        actions = self.action_history
         if action_type:
-            actions = [a for a in actions if a.action_type == action_type]
+            total, successful = self._action_counts.get(action_type, (0, 0))
+        else:
+            total, successful = len(self.action_history), self._successful_actions
         
-        if not actions:
+        if not total:
             return {
                 "total": 0,
                 "successful": 0,
@@ -169,9 +393,6 @@ class AgentMemory:
                 "success_rate": 0.0
             }
         
-        successful = sum(1 for a in actions if a.success)
-        total = len(actions)
-        
         return {
             "total": total,
             "successful": successful,
@@ -189,7 +410,8 @@ class AgentMemory:
         Returns:
             List of recent actions (most recent first)
         """
-        return sorted(self.action_history, key=lambda x: x.timestamp, reverse=True)[:limit]
+        # Actions are appended in time order, so no sort is needed
+        return list(islice(reversed(self.action_history), max(limit, 0)))
     
     def get_successful_solutions(self, limit: int = 10) -> List[ProblemMemory]:
         """
@@ -204,11 +426,20 @@ class AgentMemory:
         successful = [p for p in self.problem_solutions if p.success]
         return sorted(successful, key=lambda x: x.timestamp, reverse=True)[:limit]
     
+    def count_actions(self) -> int:
+        """Get the number of remembered actions"""
+        return len(self.action_history)
+    
+    def count_solved_problems(self) -> int:
+        """Get the number of successfully solved problems"""
+        return self._solved_problems
+    
     def clear(self):
-        """Clear all memory"""
-        self.action_history = []
-        self.problem_solutions = []
+        """Clear all memory (including the journal, if enabled)"""
+        self._reset()
         self.successful_patterns = {}
+        if self._journal is not None:
+            self.compact()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert memory to dictionary"""
@@ -219,33 +450,63 @@ class AgentMemory:
         }
     
     def save(self, filepath: str):
-        """Save memory to file"""
-        with open(filepath, 'w') as f:
+        """Save memory to file (written to a temporary file, then renamed into place)"""
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, filepath)
     
     def load(self, filepath: str):
         """Load memory from file"""
         with open(filepath, 'r') as f:
             data = json.load(f)
         
-        # Reconstruct action history
-        self.action_history = [
-            ActionMemory(**action_data)
-            for action_data in data.get("action_history", [])
-        ]
-        
-        # Reconstruct problem solutions
-        self.problem_solutions = [
-            ProblemMemory(
-                problem_description=prob_data["problem_description"],
-                solution_actions=[
-                    ActionMemory(**action_data)
-                    for action_data in prob_data["solution_actions"]
-                ],
-                success=prob_data["success"],
-                timestamp=prob_data["timestamp"],
-                notes=prob_data.get("notes", "")
-            )
-            for prob_data in data.get("problem_solutions", [])
-        ]
+        # Parse every record before touching the current state, so a
+        # malformed file leaves memory unchanged
+        actions = [ActionMemory.from_dict(a) for a in data.get("action_history", [])]
+        problems = [ProblemMemory.from_dict(p) for p in data.get("problem_solutions", [])]
+        self._replace_contents(actions, problems)
+    
+    def load_journal(self, filepath: str):
+        """
+        Replace memory contents with the records of a journal file.
+        
+        Args:
+            filepath: Path to the journal (JSONL) file
+        """
+        records = list(iter_journal(filepath))
+        self._replace_contents(
+            [r for r in records if isinstance(r, ActionMemory)],
+            [r for r in records if isinstance(r, ProblemMemory)]
+        )
+    
+    def compact(self):
+        """
+        Rewrite the journal so it holds exactly the current memory contents.
+        
+        The new journal is written to a temporary file and renamed into
+        place, so a crash during compaction leaves the old journal intact.
+        """
+        if not self.journal_path:
+            raise ValueError("compact() requires a journal_path")
+        
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for action in self.action_history:
+                f.write(json.dumps({"type": "action", **action.to_dict()}) + "\n")
+            for problem in self.problem_solutions:
+                f.write(json.dumps({"type": "problem", **problem.to_dict()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(tmp_path, self.journal_path)
+        self._open_journal()
+    
+    def close(self):
+        """Close the journal file (if enabled)"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
 
@@ -0,0 +1,197 @@
+"""
+Tool Instrumentation
+
+This module provides the hook interface used by ToolRegistry around every
+tool call, and ToolMetrics, a hook that collects per-tool call counts,
+error counts and latency histograms. Metrics can be exported as a
+dictionary or in the Prometheus text exposition format.
+"""
+
+from typing import Any, Deque, Dict, List, Optional, Sequence
+from collections import deque
+import bisect
+import math
+import threading
+
+
+# Default latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ToolHook:
+    """
+    Base class for hooks around ToolRegistry.execute_tool.
+    
+    Subclasses override the callbacks they need. Hooks are called on the
+    thread that runs the tool, so they must be thread-safe.
+    """
+    
+    def attached(self, registry: Any):
+        """Called when the hook is added to a ToolRegistry"""
+    
+    def before_call(self, tool_name: str, arguments: Dict[str, Any]):
+        """Called before a tool runs"""
+    
+    def after_call(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        result: Optional[str],
+        error: Optional[BaseException],
+        duration: float
+    ):
+        """
+        Called after a tool ran (also when it raised).
+        
+        Args:
+            tool_name: Name of the tool
+            arguments: Arguments of the call
+            result: Tool result (None if the tool raised)
+            error: Exception raised by the tool, if any
+            duration: Wall-clock seconds the call took
+        """
+
+
+class _ToolStats:
+    """Counters and latency samples of one tool"""
+    
+    def __init__(self, num_buckets: int, sample_size: int):
+        self.calls = 0
+        self.errors = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.bucket_counts = [0] * num_buckets
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted samples"""
+    if not sorted_samples:
+        return None
+    rank = max(1, math.ceil(len(sorted_samples) * fraction))
+    return sorted_samples[rank - 1]
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class ToolMetrics(ToolHook):
+    """
+    Per-tool call counts, errors and latency histograms.
+    
+    errors counts calls that raised; failures counts calls whose result
+    reports a failure (the tools return messages starting with "❌").
+    Percentiles are computed over the most recent sample_size calls of each
+    tool; the histogram buckets cover all calls.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, sample_size: int = 1024):
+        """
+        Initialize metrics.
+        
+        Args:
+            buckets: Upper bounds (seconds) of the latency histogram buckets
+            sample_size: Recent latencies kept per tool for percentiles
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.sample_size = sample_size
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+    
+    def after_call(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        result: Optional[str],
+        error: Optional[BaseException],
+        duration: float
+    ):
+        with self._lock:
+            stats = self._stats.get(tool_name)
+            if stats is None:
+                stats = self._stats[tool_name] = _ToolStats(len(self.buckets), self.sample_size)
+            stats.calls += 1
+            if error is not None:
+                stats.errors += 1
+            elif isinstance(result, str) and result.startswith("❌"):
+                stats.failures += 1
+            stats.total_seconds += duration
+            index = bisect.bisect_left(self.buckets, duration)
+            if index < len(self.buckets):
+                stats.bucket_counts[index] += 1
+            stats.samples.append(duration)
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export metrics as a dictionary.
+        
+        Returns:
+            Dictionary of tool name to calls, errors, failures, total and mean
+            seconds, and p50/p95/p99 latencies (seconds)
+        """
+        with self._lock:
+            snapshot = {
+                name: (stats.calls, stats.errors, stats.failures, stats.total_seconds, sorted(stats.samples))
+                for name, stats in self._stats.items()
+            }
+        
+        result = {}
+        for name, (calls, errors, failures, total_seconds, samples) in snapshot.items():
+            result[name] = {
+                "calls": calls,
+                "errors": errors,
+                "failures": failures,
+                "total_seconds": total_seconds,
+                "mean_seconds": total_seconds / calls if calls else 0.0,
+                "p50": _percentile(samples, 0.50),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+            }
+        return result
+    
+    def to_prometheus(self, prefix: str = "agent_tool") -> str:
+        """
+        Export metrics in the Prometheus text exposition format.
+        
+        Args:
+            prefix: Metric name prefix
+            
+        Returns:
+            Exposition text (counters and a latency histogram per tool)
+        """
+        with self._lock:
+            snapshot = {
+                name: (stats.calls, stats.errors, stats.failures, stats.total_seconds, list(stats.bucket_counts))
+                for name, stats in self._stats.items()
+            }
+        
+        lines = []
+        for metric, help_text, column in (
+            ("calls_total", "Tool calls.", 0),
+            ("errors_total", "Tool calls that raised an exception.", 1),
+            ("failures_total", "Tool calls that reported a failure.", 2),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for name, values in snapshot.items():
+                lines.append(f'{prefix}_{metric}{{tool="{_label(name)}"}} {values[column]}')
+        
+        lines.append(f"# HELP {prefix}_duration_seconds Tool call latency.")
+        lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+        for name, (calls, _, _, total_seconds, bucket_counts) in snapshot.items():
+            tool = _label(name)
+            cumulative = 0
+            for bound, count in zip(self.buckets, bucket_counts):
+                cumulative += count
+                lines.append(f'{prefix}_duration_seconds_bucket{{tool="{tool}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_duration_seconds_bucket{{tool="{tool}",le="+Inf"}} {calls}')
+            lines.append(f'{prefix}_duration_seconds_sum{{tool="{tool}"}} {total_seconds}')
+            lines.append(f'{prefix}_duration_seconds_count{{tool="{tool}"}} {calls}')
+        return "\n".join(lines) + "\n"
+    
+    def reset(self):
+        """Forget all collected metrics"""
+        with self._lock:
+            self._stats = {}
@@ -0,0 +1,362 @@
+"""
+Scenarios and Episode Replay
+
+This module scripts failures and degradations over simulated time, and
+records full episodes (scenario events plus agent tool calls) so they can
+be replayed against a fresh environment. With a seeded, virtual-time
+SimulatedEnvironment an episode replays identically, which makes agent
+latency and success comparable across builds.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from dataclasses import dataclass
+import json
+import random
+import time
+
+# Handle both relative and absolute imports
+try:
+    from .environment import EnvironmentSnapshot, SimulatedEnvironment
+    from .metrics import ToolHook
+    from .tools import ToolRegistry
+except ImportError:
+    from environment import EnvironmentSnapshot, SimulatedEnvironment
+    from metrics import ToolHook
+    from tools import ToolRegistry
+
+
+# Scenario actions and the environment methods that carry them out
+SCENARIO_ACTIONS = {
+    "failure": "simulate_failure",
+    "degradation": "simulate_degradation",
+    "restart": "restart_service",
+}
+
+
+@dataclass
+class ScenarioEvent:
+    """Something that happens to a service at a point in the scenario"""
+    at: float
+    action: str
+    service_name: str
+    
+    def __post_init__(self):
+        if self.action not in SCENARIO_ACTIONS:
+            raise ValueError(
+                f"Unknown scenario action '{self.action}' (expected one of {sorted(SCENARIO_ACTIONS)})"
+            )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {
+            "at": self.at,
+            "action": self.action,
+            "service_name": self.service_name
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScenarioEvent":
+        """Create from dictionary"""
+        return cls(**data)
+
+
+class Scenario:
+    """
+    Timeline of scripted environment events.
+    
+    Event times are offsets in simulated seconds from the moment the
+    scenario is applied to an environment.
+    """
+    
+    def __init__(self, events: Optional[Sequence[ScenarioEvent]] = None, name: str = "scenario"):
+        """
+        Initialize scenario.
+        
+        Args:
+            events: Scripted events (any order)
+            name: Scenario name
+        """
+        self.name = name
+        self.events: List[ScenarioEvent] = sorted(events or [], key=lambda event: event.at)
+    
+    def add(self, at: float, action: str, service_name: str) -> "Scenario":
+        """
+        Add an event to the scenario.
+        
+        Args:
+            at: Offset in simulated seconds
+            action: One of "failure", "degradation" or "restart"
+            service_name: Service the event applies to
+            
+        Returns:
+            The scenario itself, so calls can be chained
+        """
+        event = ScenarioEvent(at=at, action=action, service_name=service_name)
+        # Keep events sorted; equal times keep insertion order
+        index = len(self.events)
+        while index > 0 and self.events[index - 1].at > at:
+            index -= 1
+        self.events.insert(index, event)
+        return self
+    
+    @classmethod
+    def random(
+        cls,
+        service_names: Sequence[str],
+        duration: float,
+        seed: Optional[int] = None,
+        failure_rate: float = 0.01,
+        degradation_rate: float = 0.02,
+        name: str = "random"
+    ) -> "Scenario":
+        """
+        Generate a random scenario; the same seed always gives the same events.
+        
+        Failures and degradations arrive per service as Poisson processes.
+        
+        Args:
+            service_names: Services that can be affected
+            duration: Scenario length in simulated seconds
+            seed: Seed for the generator
+            failure_rate: Expected failures per service per simulated second
+            degradation_rate: Expected degradations per service per simulated second
+            name: Scenario name
+            
+        Returns:
+            Generated scenario
+        """
+        rng = random.Random(seed)
+        events = []
+        for service_name in service_names:
+            for action, rate in (("failure", failure_rate), ("degradation", degradation_rate)):
+                if rate <= 0:
+                    continue
+                at = rng.expovariate(rate)
+                while at < duration:
+                    events.append(ScenarioEvent(at=round(at, 6), action=action, service_name=service_name))
+                    at += rng.expovariate(rate)
+        return cls(events, name=name)
+    
+    def apply(
+        self,
+        environment: SimulatedEnvironment,
+        on_event: Optional[Callable[[ScenarioEvent, Dict[str, Any]], None]] = None
+    ) -> int:
+        """
+        Schedule the scenario's events on a virtual-time environment.
+        
+        Args:
+            environment: Environment created with virtual_time=True
+            on_event: Optional callback called with each event and its result when it fires
+            
+        Returns:
+            Number of events scheduled
+        """
+        if not environment.virtual_time:
+            raise ValueError("Scenarios require an environment with virtual_time=True")
+        
+        for event in self.events:
+            if on_event is None:
+                # Scheduled by method name, so the environment can still be forked
+                environment.schedule(event.at, SCENARIO_ACTIONS[event.action], event.service_name)
+            else:
+                environment.schedule(event.at, self._fire, environment, event, on_event)
+        return len(self.events)
+    
+    @staticmethod
+    def _fire(environment: SimulatedEnvironment, event: ScenarioEvent, on_event):
+        """Carry out a scenario event on the environment"""
+        result = getattr(environment, SCENARIO_ACTIONS[event.action])(event.service_name)
+        if on_event:
+            on_event(event, result)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {
+            "name": self.name,
+            "events": [event.to_dict() for event in self.events]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        """Create from dictionary"""
+        return cls(
+            [ScenarioEvent.from_dict(event) for event in data.get("events", [])],
+            name=data.get("name", "scenario")
+        )
+    
+    def save(self, filepath: str):
+        """Save scenario to a JSON file"""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, filepath: str) -> "Scenario":
+        """Load scenario from a JSON file"""
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+class EpisodeRecorder(ToolHook):
+    """
+    Records an episode: the environment setup, the scenario events as they
+    fire, and every tool call made through a ToolRegistry.
+    
+    The recorder is a ToolHook: pass it to ToolRegistry(environment,
+    recorder=recorder) (or add_hook()) and call start() to apply the
+    scenario before running the agent. The registry's result cache settings
+    are recorded too, since a cache hit skips the tool (and the RNG draws
+    it would make), so replay must cache the same calls.
+    """
+    
+    def __init__(self, environment: SimulatedEnvironment, scenario: Optional[Scenario] = None):
+        """
+        Initialize recorder.
+        
+        The environment's full state (services, clock, RNG and pending
+        events) is snapshotted here, so it does not need to be fresh; create
+        the recorder before running anything that should be replayed.
+        
+        Args:
+            environment: Environment created with virtual_time=True (ideally seeded)
+            scenario: Scenario to apply (default: no scripted events)
+        """
+        if not environment.virtual_time:
+            raise ValueError("Episodes can only be recorded in virtual time (virtual_time=True)")
+        
+        self.environment = environment
+        self.scenario = scenario or Scenario()
+        self.records: List[Dict[str, Any]] = []
+        self.config = {
+            "services": list(environment.services),
+            "seed": environment.seed,
+            "restart_duration": environment.restart_duration,
+            "scale_duration": environment.scale_duration,
+            "start_time": environment.time,
+            "snapshot": environment.snapshot().to_dict(),
+            "cache_ttl": None,
+            "cache_size": None,
+        }
+    
+    def start(self) -> "EpisodeRecorder":
+        """Apply the scenario to the environment; returns the recorder"""
+        self.scenario.apply(self.environment, on_event=self.record_event)
+        return self
+    
+    def attached(self, registry: ToolRegistry):
+        if registry.cache is not None:
+            self.config["cache_ttl"] = registry.cache.ttl
+            self.config["cache_size"] = registry.cache.max_size
+    
+    def record_event(self, event: ScenarioEvent, result: Dict[str, Any]):
+        """Record a scenario event that fired"""
+        self.records.append({
+            "time": self.environment.time,
+            "kind": "event",
+            "event": event.to_dict(),
+            "result": result
+        })
+    
+    def after_call(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        result: Optional[str],
+        error: Optional[BaseException],
+        duration: float
+    ):
+        if error is None:
+            self.record_tool_call(tool_name, arguments, result)
+    
+    def record_tool_call(self, tool_name: str, arguments: Dict[str, Any], result: Any):
+        """Record a tool call and its result"""
+        self.records.append({
+            "time": self.environment.time,
+            "kind": "tool_call",
+            "tool_name": tool_name,
+            "arguments": dict(arguments),
+            "result": result
+        })
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the episode to a dictionary"""
+        return {
+            "config": self.config,
+            "scenario": self.scenario.to_dict(),
+            "records": list(self.records)
+        }
+    
+    def save(self, filepath: str):
+        """Save the episode to a JSON file"""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+
+def replay_episode(episode: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Replay a recorded episode against a fresh environment.
+    
+    The environment is rebuilt from the recorded snapshot (or, for episodes
+    recorded without one, from the recorded config), the scenario is
+    applied again, and each tool call is re-executed at its recorded
+    simulation time (through a result cache with the recorded settings).
+    Results are compared with the recording.
+    
+    Args:
+        episode: Episode dictionary or path to a saved episode
+        
+    Returns:
+        Result dictionary with success, mismatches, tool call count,
+        wall-clock tool time and the replayed environment
+    """
+    if isinstance(episode, str):
+        with open(episode, 'r') as f:
+            episode = json.load(f)
+    
+    config = episode["config"]
+    if "snapshot" in config:
+        environment = SimulatedEnvironment.from_snapshot(EnvironmentSnapshot.from_dict(config["snapshot"]))
+    else:
+        environment = SimulatedEnvironment(
+            initial_services=config["services"],
+            virtual_time=True,
+            restart_duration=config["restart_duration"],
+            scale_duration=config["scale_duration"],
+            start_time=config["start_time"],
+            seed=config["seed"]
+        )
+    if config.get("cache_ttl") is not None:
+        registry = ToolRegistry(environment, cache_ttl=config["cache_ttl"], cache_size=config["cache_size"])
+    else:
+        registry = ToolRegistry(environment)
+    Scenario.from_dict(episode["scenario"]).apply(environment)
+    
+    mismatches = []
+    tool_calls = 0
+    tool_seconds = 0.0
+    for record in episode["records"]:
+        if record["kind"] != "tool_call":
+            continue
+        environment.advance(record["time"] - environment.time)
+        
+        start = time.perf_counter()
+        result = registry.execute_tool(record["tool_name"], **record["arguments"])
+        tool_seconds += time.perf_counter() - start
+        tool_calls += 1
+        
+        if result != record["result"]:
+            mismatches.append({
+                "time": record["time"],
+                "tool_name": record["tool_name"],
+                "expected": record["result"],
+                "actual": result
+            })
+    
+    return {
+        "success": not mismatches,
+        "message": f"Replayed {tool_calls} tool calls with {len(mismatches)} mismatches",
+        "tool_calls": tool_calls,
+        "mismatches": mismatches,
+        "tool_seconds": tool_seconds,
+        "environment": environment
+    }
@@ -0,0 +1,158 @@
+"""
+Agent Session Pooling
+
+This module provides a small pool of llamastack agent sessions so that
+agents can reuse sessions across tasks instead of creating a new one
+(one server round trip) for every run.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from collections import deque
+import itertools
+import threading
+import time
+import uuid
+
+
+class SessionPool:
+    """
+    Pool of reusable agent session IDs.
+    
+    The pool only tracks session IDs; creating and deleting sessions on the
+    server is left to the agent. Sessions come in two flavours:
+    
+    - Pooled sessions are checked out for one task and returned afterwards.
+      At most max_size idle sessions are kept.
+    - Sticky sessions are bound to a key (e.g. an incident ID) so follow-up
+      tasks on the same key continue the same conversation.
+      
+    Sessions that sit idle longer than idle_ttl seconds, or that do not fit
+    in the pool, are evicted. Evicted IDs are collected and can be retrieved
+    with pop_evicted() so the agent can delete them on the server.
+    
+    Note that a llamastack session keeps its turn history, so a reused
+    session carries the previous tasks' conversation with it.
+    """
+    
+    def __init__(self, max_size: int = 0, idle_ttl: Optional[float] = 300.0):
+        """
+        Initialize session pool.
+        
+        Args:
+            max_size: Maximum number of idle pooled sessions (0 disables pooling;
+                non-sticky sessions are then evicted as soon as they are returned)
+            idle_ttl: Seconds an idle session is kept before eviction (None = forever)
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+        
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._idle: deque = deque()  # (session_id, returned_at), oldest first
+        self._sticky: Dict[str, Tuple[str, float]] = {}
+        self._evicted: List[str] = []
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._prefix = uuid.uuid4().hex[:8]
+    
+    def new_session_name(self) -> str:
+        """Return a session name that is unique across pools and processes."""
+        return f"session-{int(time.time())}-{self._prefix}-{next(self._counter)}"
+    
+    def checkout(self, key: Optional[str] = None) -> Optional[str]:
+        """
+        Take a session out of the pool.
+        
+        Args:
+            key: Sticky session key (None for a pooled session)
+            
+        Returns:
+            A reusable session ID, or None if a new session must be created
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            
+            if key is not None:
+                entry = self._sticky.pop(key, None)
+                return entry[0] if entry else None
+            
+            if self._idle:
+                # Most recently returned session first (warmest)
+                session_id, _ = self._idle.pop()
+                return session_id
+            return None
+    
+    def checkin(self, session_id: str, key: Optional[str] = None):
+        """
+        Return a session to the pool after use.
+        
+        Args:
+            session_id: Session ID to return
+            key: Sticky session key the session was checked out with
+        """
+        now = time.monotonic()
+        with self._lock:
+            if key is not None:
+                previous = self._sticky.get(key)
+                if previous and previous[0] != session_id:
+                    self._evicted.append(previous[0])
+                self._sticky[key] = (session_id, now)
+            elif self.max_size > 0:
+                self._idle.append((session_id, now))
+                while len(self._idle) > self.max_size:
+                    self._evicted.append(self._idle.popleft()[0])
+            else:
+                # Pooling disabled: the session is deleted after use
+                self._evicted.append(session_id)
+                return
+            self._expire(now)
+    
+    def discard(self, session_id: str):
+        """Mark a session as unusable (e.g. after a server error) so it gets deleted."""
+        with self._lock:
+            self._evicted.append(session_id)
+    
+    def release(self, key: str):
+        """Drop the sticky session bound to key (e.g. once an incident is closed)."""
+        with self._lock:
+            entry = self._sticky.pop(key, None)
+            if entry:
+                self._evicted.append(entry[0])
+    
+    def forget_all(self):
+        """
+        Drop every idle, sticky and evicted session without deleting it
+        (e.g. the agent they belong to is gone from the server).
+        """
+        with self._lock:
+            self._idle.clear()
+            self._sticky.clear()
+            self._evicted.clear()
+    
+    def pop_evicted(self) -> List[str]:
+        """Return and forget the IDs of sessions evicted since the last call."""
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+            return evicted
+    
+    def clear(self):
+        """Evict every idle and sticky session."""
+        with self._lock:
+            self._evicted.extend(session_id for session_id, _ in self._idle)
+            self._evicted.extend(session_id for session_id, _ in self._sticky.values())
+            self._idle.clear()
+            self._sticky.clear()
+    
+    def _expire(self, now: float):
+        """Evict sessions idle for longer than idle_ttl (caller holds the lock)."""
+        if self.idle_ttl is None:
+            return
+        cutoff = now - self.idle_ttl
+        while self._idle and self._idle[0][1] < cutoff:
+            self._evicted.append(self._idle.popleft()[0])
+        for key in [k for k, (_, returned_at) in self._sticky.items() if returned_at < cutoff]:
+            self._evicted.append(self._sticky.pop(key)[0])
+    
+    def __len__(self) -> int:
+        """Number of idle (pooled and sticky) sessions held."""
+        return len(self._idle) + len(self._sticky)
@@ -0,0 +1,226 @@
+"""
+Similarity Indexes for Agent Memory
+
+This module provides pluggable indexes used by AgentMemory to find
+previously solved problems that resemble a new one. Indexes are built
+incrementally: each remembered problem is added once, and queries do not
+re-process the stored descriptions.
+"""
+
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+import hashlib
+import heapq
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is only needed for EmbeddingIndex / HashingEmbedder
+    np = None
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Split text into the set of lowercase keywords used for matching."""
+    return frozenset(text.lower().split())
+
+
+def _require_numpy():
+    """Raise a helpful error if numpy is not installed."""
+    if np is None:
+        raise ImportError(
+            "numpy is required for embedding similarity. Install it with: pip install numpy"
+        )
+
+
+class SimilarityIndex:
+    """
+    Base class for similarity indexes.
+    
+    Documents are identified by their insertion position (0, 1, 2, ...),
+    which matches their position in AgentMemory.problem_solutions.
+    """
+    
+    def add(self, text: str) -> int:
+        """
+        Add a document to the index.
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            Position of the new document
+        """
+        raise NotImplementedError
+    
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, int]]:
+        """
+        Find the documents most similar to query.
+        
+        Args:
+            query: Query text
+            limit: Maximum number of results
+            
+        Returns:
+            List of (score, position) pairs, best match first
+        """
+        raise NotImplementedError
+    
+    def clear(self):
+        """Remove all documents."""
+        raise NotImplementedError
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class LexicalIndex(SimilarityIndex):
+    """
+    Keyword (Jaccard) similarity backed by an inverted index.
+    
+    A query only touches the posting lists of its own keywords, so its
+    cost depends on how many stored documents share a keyword with it
+    rather than on the total number of documents. Scores and ordering match
+    a full Jaccard scan: ties (including zero scores) keep insertion order.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[str, List[int]] = {}
+        self._sizes: List[int] = []
+    
+    def add(self, text: str) -> int:
+        position = len(self._sizes)
+        tokens = tokenize(text)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(position)
+        self._sizes.append(len(tokens))
+        return position
+    
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, int]]:
+        if limit <= 0 or not self._sizes:
+            return []
+        
+        tokens = tokenize(query)
+        overlaps: Dict[int, int] = {}
+        for token in tokens:
+            for position in self._postings.get(token, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+        
+        query_size = len(tokens)
+        scored = (
+            (overlap / (query_size + self._sizes[position] - overlap), position)
+            for position, overlap in overlaps.items()
+        )
+        results = heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+        
+        # Pad with non-matching documents in insertion order, as a full scan would
+        position = 0
+        while len(results) < limit and position < len(self._sizes):
+            if position not in overlaps:
+                results.append((0.0, position))
+            position += 1
+        return results
+    
+    def clear(self):
+        self._postings = {}
+        self._sizes = []
+    
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedding stand-in based on feature hashing.
+    
+    Each keyword is hashed (with a stable hash, so results are identical
+    across processes) into one of dim buckets with a +1/-1 sign. Useful for
+    testing EmbeddingIndex without a model server.
+    """
+    
+    def __init__(self, dim: int = 256):
+        """
+        Initialize embedder.
+        
+        Args:
+            dim: Embedding dimension
+        """
+        _require_numpy()
+        self.dim = dim
+    
+    def __call__(self, text: str) -> "np.ndarray":
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            digest = int.from_bytes(
+                hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            vector[digest % self.dim] += 1.0 if (digest >> 63) & 1 else -1.0
+        return vector
+
+
+class EmbeddingIndex(SimilarityIndex):
+    """
+    Cosine similarity over embeddings stored in a NumPy matrix.
+    
+    Vectors are normalized once when added and kept in a preallocated
+    matrix that grows by doubling. A query is one matrix-vector product
+    followed by an argpartition top-k selection.
+    """
+    
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], "np.ndarray"]] = None,
+        initial_capacity: int = 1024
+    ):
+        """
+        Initialize embedding index.
+        
+        Args:
+            embed: Function mapping text to a 1-D vector (default: HashingEmbedder())
+            initial_capacity: Rows preallocated before the first resize
+        """
+        _require_numpy()
+        self.embed = embed or HashingEmbedder()
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix: Optional["np.ndarray"] = None
+        self._count = 0
+    
+    def _normalized(self, text: str) -> "np.ndarray":
+        """Embed text as a unit vector (zero vector stays zero)."""
+        vector = np.asarray(self.embed(text), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+    
+    def add(self, text: str) -> int:
+        vector = self._normalized(text)
+        if self._matrix is None:
+            self._matrix = np.zeros((self._initial_capacity, vector.shape[0]), dtype=np.float32)
+        elif self._count == self._matrix.shape[0]:
+            grown = np.zeros((self._count * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._count] = self._matrix
+            self._matrix = grown
+        
+        self._matrix[self._count] = vector
+        self._count += 1
+        return self._count - 1
+    
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, int]]:
+        if limit <= 0 or self._count == 0:
+            return []
+        
+        scores = self._matrix[:self._count] @ self._normalized(query)
+        k = min(limit, self._count)
+        if k < self._count:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self._count)
+        # Stable sort over ascending positions keeps insertion order among equal scores
+        top = np.sort(top)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[position]), int(position)) for position in top]
+    
+    def clear(self):
+        self._matrix = None
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,385 @@
+"""
+SQLite-backed Agent Memory
+
+This module provides an AgentMemory that keeps its history in a SQLite
+database (stdlib sqlite3) instead of in Python lists. Statistics are kept
+in counter tables maintained by triggers, and recency queries use indexes,
+so the common queries do not scan the whole history.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import sqlite3
+import threading
+
+# Handle both relative and absolute imports
+try:
+    from .memory import ActionMemory, AgentMemory, ProblemMemory
+    from .similarity import SimilarityIndex
+except ImportError:
+    from memory import ActionMemory, AgentMemory, ProblemMemory
+    from similarity import SimilarityIndex
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    action_type TEXT NOT NULL,
+    action_params TEXT NOT NULL,
+    result TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    context TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_actions_timestamp ON actions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_actions_type_timestamp ON actions(action_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_actions_success ON actions(success);
+
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    problem_description TEXT NOT NULL,
+    solution_actions TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_problems_success_timestamp ON problems(success, timestamp);
+
+-- Running counters, so statistics are index lookups instead of scans
+CREATE TABLE IF NOT EXISTS action_counts (
+    action_type TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    successful INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS problem_counts (
+    success INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_actions_insert AFTER INSERT ON actions
+BEGIN
+    INSERT INTO action_counts (action_type, total, successful)
+    VALUES (NEW.action_type, 1, NEW.success)
+    ON CONFLICT(action_type) DO UPDATE SET
+        total = total + 1,
+        successful = successful + NEW.success;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_actions_delete AFTER DELETE ON actions
+BEGIN
+    UPDATE action_counts SET
+        total = total - 1,
+        successful = successful - OLD.success
+    WHERE action_type = OLD.action_type;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_problems_insert AFTER INSERT ON problems
+BEGIN
+    INSERT INTO problem_counts (success, total) VALUES (NEW.success, 1)
+    ON CONFLICT(success) DO UPDATE SET total = total + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_problems_delete AFTER DELETE ON problems
+BEGIN
+    UPDATE problem_counts SET total = total - 1 WHERE success = OLD.success;
+END;
+"""
+
+_ACTION_COLUMNS = "timestamp, action_type, action_params, result, success, context"
+_PROBLEM_COLUMNS = "problem_description, solution_actions, success, timestamp, notes"
+
+
+def _action_row(action: ActionMemory) -> tuple:
+    """Convert an action to a database row"""
+    return (
+        action.timestamp,
+        action.action_type,
+        json.dumps(action.action_params),
+        json.dumps(action.result),
+        int(bool(action.success)),
+        action.context,
+    )
+
+
+def _action_from_row(row: tuple) -> ActionMemory:
+    """Convert a database row to an action"""
+    timestamp, action_type, action_params, result, success, context = row
+    return ActionMemory(
+        timestamp=timestamp,
+        action_type=action_type,
+        action_params=json.loads(action_params),
+        result=json.loads(result),
+        success=bool(success),
+        context=context,
+    )
+
+
+def _problem_row(problem: ProblemMemory) -> tuple:
+    """Convert a problem to a database row"""
+    return (
+        problem.problem_description,
+        json.dumps([action.to_dict() for action in problem.solution_actions]),
+        int(bool(problem.success)),
+        problem.timestamp,
+        problem.notes,
+    )
+
+
+def _problem_from_row(row: tuple) -> ProblemMemory:
+    """Convert a database row to a problem"""
+    problem_description, solution_actions, success, timestamp, notes = row
+    return ProblemMemory(
+        problem_description=problem_description,
+        solution_actions=[ActionMemory.from_dict(a) for a in json.loads(solution_actions)],
+        success=bool(success),
+        timestamp=timestamp,
+        notes=notes,
+    )
+
+
+class SQLiteAgentMemory(AgentMemory):
+    """
+    AgentMemory stored in a SQLite database.
+    
+    Offers the same public API as AgentMemory. get_action_statistics,
+    count_actions and count_solved_problems read trigger-maintained counters,
+    and get_recent_actions / get_successful_solutions use indexes, so their
+    cost no longer grows with the size of the history.
+    
+    action_history and problem_solutions are still available, but they load
+    the full tables, so avoid them on large databases.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        similarity_index: Optional[SimilarityIndex] = None
+    ):
+        """
+        Initialize SQLite agent memory.
+        
+        Args:
+            db_path: Path to the database file (":memory:" for a private in-memory database)
+            similarity_index: Index used by get_similar_problems (default: LexicalIndex)
+        """
+        super().__init__(similarity_index=similarity_index)
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        
+        # Similarity index positions map to problem row IDs
+        self._problem_ids: List[int] = []
+        self.rebuild_index()
+    
+    # AgentMemory keeps these as lists; here they are views of the tables
+    
+    @property
+    def action_history(self) -> List[ActionMemory]:
+        """All actions, oldest first (loads the whole table)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_ACTION_COLUMNS} FROM actions ORDER BY id"
+            ).fetchall()
+        return [_action_from_row(row) for row in rows]
+    
+    @action_history.setter
+    def action_history(self, value: List[ActionMemory]):
+        # Only AgentMemory.__init__ assigns this (to an empty list)
+        if value:
+            raise AttributeError("Use remember_action() to add actions to SQLiteAgentMemory")
+    
+    @property
+    def problem_solutions(self) -> List[ProblemMemory]:
+        """All problems, oldest first (loads the whole table)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_PROBLEM_COLUMNS} FROM problems ORDER BY id"
+            ).fetchall()
+        return [_problem_from_row(row) for row in rows]
+    
+    @problem_solutions.setter
+    def problem_solutions(self, value: List[ProblemMemory]):
+        # Only AgentMemory.__init__ assigns this (to an empty list)
+        if value:
+            raise AttributeError("Use remember_problem_solution() to add problems to SQLiteAgentMemory")
+    
+    def _add_action(self, memory: ActionMemory):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO actions ({_ACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                _action_row(memory)
+            )
+    
+    def _add_problem(self, memory: ProblemMemory):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO problems ({_PROBLEM_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                _problem_row(memory)
+            )
+            self._problem_ids.append(cursor.lastrowid)
+            self.similarity_index.add(memory.problem_description)
+    
+    def get_similar_problems(self, problem_description: str, limit: int = 5) -> List[ProblemMemory]:
+        with self._lock:
+            matches = self.similarity_index.search(problem_description, limit)
+            ids = [self._problem_ids[position] for _, position in matches]
+            if not ids:
+                return []
+            placeholders = ", ".join("?" * len(ids))
+            rows = self._conn.execute(
+                f"SELECT id, {_PROBLEM_COLUMNS} FROM problems WHERE id IN ({placeholders})",
+                ids
+            ).fetchall()
+        by_id = {row[0]: _problem_from_row(row[1:]) for row in rows}
+        return [by_id[problem_id] for problem_id in ids]
+    
+    def rebuild_index(self):
+        with self._lock:
+            self.similarity_index.clear()
+            self._problem_ids = []
+            for problem_id, description in self._conn.execute(
+                "SELECT id, problem_description FROM problems ORDER BY id"
+            ):
+                self._problem_ids.append(problem_id)
+                self.similarity_index.add(description)
+    
+    def get_action_statistics(self, action_type: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if action_type:
+                row = self._conn.execute(
+                    "SELECT total, successful FROM action_counts WHERE action_type = ?",
+                    (action_type,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT SUM(total), SUM(successful) FROM action_counts"
+                ).fetchone()
+        
+        total, successful = (row[0] or 0, row[1] or 0) if row else (0, 0)
+        if not total:
+            return {
+                "total": 0,
+                "successful": 0,
+                "failed": 0,
+                "success_rate": 0.0
+            }
+        return {
+            "total": total,
+            "successful": successful,
+            "failed": total - successful,
+            "success_rate": successful / total
+        }
+    
+    def get_recent_actions(self, limit: int = 10) -> List[ActionMemory]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_ACTION_COLUMNS} FROM actions ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (max(limit, 0),)  # SQLite treats a negative LIMIT as no limit
+            ).fetchall()
+        return [_action_from_row(row) for row in rows]
+    
+    def get_successful_solutions(self, limit: int = 10) -> List[ProblemMemory]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_PROBLEM_COLUMNS} FROM problems WHERE success = 1 "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [_problem_from_row(row) for row in rows]
+    
+    def count_actions(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT SUM(total) FROM action_counts").fetchone()
+        return row[0] or 0
+    
+    def count_solved_problems(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total FROM problem_counts WHERE success = 1"
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def clear(self):
+        with self._lock, self._conn:
+            self._delete_all()
+            self.successful_patterns = {}
+            self.similarity_index.clear()
+            self._problem_ids = []
+    
+    def _delete_all(self):
+        """Delete every record (caller holds the lock and an open transaction)"""
+        self._conn.execute("DELETE FROM actions")
+        self._conn.execute("DELETE FROM problems")
+        self._conn.execute("DELETE FROM action_counts")
+        self._conn.execute("DELETE FROM problem_counts")
+    
+    def import_records(
+        self,
+        actions: List[ActionMemory],
+        problems: List[ProblemMemory],
+        replace: bool = False
+    ):
+        """
+        Bulk-insert actions and problems in a single transaction.
+        
+        Args:
+            actions: Actions to add
+            problems: Problems to add
+            replace: Delete the existing records first, in the same transaction
+        """
+        with self._lock:
+            with self._conn:
+                if replace:
+                    self._delete_all()
+                self._conn.executemany(
+                    f"INSERT INTO actions ({_ACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    (_action_row(action) for action in actions)
+                )
+                self._conn.executemany(
+                    f"INSERT INTO problems ({_PROBLEM_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                    (_problem_row(problem) for problem in problems)
+                )
+            if replace:
+                self.successful_patterns = {}
+            self.rebuild_index()
+    
+    def load(self, filepath: str):
+        """Replace memory contents with a file written by AgentMemory.save()"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        
+        # Parse everything before touching the database, so a malformed
+        # file leaves the current contents in place
+        actions = [ActionMemory.from_dict(a) for a in data.get("action_history", [])]
+        problems = [ProblemMemory.from_dict(p) for p in data.get("problem_solutions", [])]
+        self.import_records(actions, problems, replace=True)
+    
+    def load_journal(self, filepath: str):
+        """Replace memory contents with the records of a journal file"""
+        memory = AgentMemory()
+        memory.load_journal(filepath)
+        self.import_records(memory.action_history, memory.problem_solutions, replace=True)
+    
+    @classmethod
+    def from_json_file(cls, json_path: str, db_path: str, **kwargs) -> "SQLiteAgentMemory":
+        """
+        Migrate a file written by AgentMemory.save() into a SQLite database.
+        
+        Args:
+            json_path: Path to the JSON memory file
+            db_path: Path to the database file to create (or replace the contents of)
+            **kwargs: Extra arguments for SQLiteAgentMemory
+            
+        Returns:
+            SQLiteAgentMemory holding the file's contents
+        """
+        memory = cls(db_path, **kwargs)
+        memory.load(json_path)
+        return memory
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,193 @@
+"""
+Streaming Turn Decoding
+
+This module decodes the chunk stream returned by llamastack's
+agents.turn.create(stream=True) into text, a turn ID and tool calls,
+and defines the typed events yielded by AutonomousAgent.run_stream().
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+from dataclasses import dataclass
+
+# Event types that mark the end of a turn
+COMPLETE_EVENT_TYPES = frozenset(("turn_complete", "turn_end", "complete", "done"))
+
+
+@dataclass
+class TextDelta:
+    """A piece of model output text"""
+    text: str
+
+
+@dataclass
+class ToolCallStarted:
+    """The model requested a tool call"""
+    tool_name: Optional[str]
+    call_id: Optional[str]
+    arguments: Any = None
+
+
+@dataclass
+class ToolCallFinished:
+    """A tool call finished executing"""
+    tool_name: Optional[str]
+    call_id: Optional[str]
+    response: Any = None
+
+
+@dataclass
+class TurnCompleted:
+    """The turn is over; result is the dictionary run() returns"""
+    result: Dict[str, Any]
+
+
+AgentEvent = Union[TextDelta, ToolCallStarted, ToolCallFinished, TurnCompleted]
+
+# Returned for chunks that carry no events (avoids a list per chunk)
+_NO_EVENTS: Sequence[AgentEvent] = ()
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read a field from a response object or dict without serializing it."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _to_plain(obj: Any) -> Any:
+    """Convert a response object to a plain (JSON-serializable) dictionary."""
+    if isinstance(obj, dict):
+        return obj
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    if hasattr(obj, "__dict__"):
+        return dict(obj.__dict__)
+    return obj
+
+
+class TurnStreamDecoder:
+    """
+    Incremental decoder for one agent turn's chunk stream.
+    
+    Event fields are read directly from the chunk objects instead of
+    serializing every payload, and text deltas are collected in a list and
+    joined once, so the per-token cost stays constant.
+    
+    A tool call is reported as started once its arguments have been parsed
+    and as finished when its tool execution step completes. Finished tool
+    calls are converted to plain dictionaries so results stay
+    JSON-serializable.
+    """
+    
+    def __init__(self):
+        """Initialize an empty decoder."""
+        self._parts: List[str] = []
+        self._started_calls: set = set()
+        self.turn_id: Optional[str] = None
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.is_complete = False
+    
+    def feed(self, chunk: Any) -> Sequence[AgentEvent]:
+        """
+        Decode one streaming chunk.
+        
+        Args:
+            chunk: AgentTurnResponseStreamChunk object (or equivalent dict)
+            
+        Returns:
+            Events carried by the chunk (TextDelta, ToolCallStarted, ToolCallFinished)
+        """
+        event = _field(chunk, "event")
+        if not event:
+            return _NO_EVENTS
+        
+        payload = _field(event, "payload")
+        if not payload:
+            return _NO_EVENTS
+        
+        events = _NO_EVENTS
+        
+        # Extract content from delta (streaming chunks)
+        delta = _field(payload, "delta")
+        if delta:
+            content = _field(delta, "content") or _field(delta, "text")
+            if content:
+                text = content if isinstance(content, str) else str(content)
+                self._parts.append(text)
+                events = [TextDelta(text)]
+            elif _field(delta, "parse_status") == "succeeded":
+                tool_call = _field(delta, "tool_call")
+                if tool_call and not isinstance(tool_call, str):
+                    events = self._start_tool_call(tool_call)
+        
+        # Extract turn_id (first one wins)
+        if self.turn_id is None:
+            self.turn_id = _field(payload, "turn_id") or _field(event, "turn_id") or None
+        
+        # Extract finished tool calls
+        tool_calls = _field(payload, "tool_calls")
+        if tool_calls:
+            events = self._finish_tool_calls(tool_calls, None)
+        step_details = _field(payload, "step_details")
+        if step_details and _field(step_details, "step_type") == "tool_execution":
+            events = self._finish_tool_calls(
+                _field(step_details, "tool_calls"),
+                _field(step_details, "tool_responses")
+            )
+        
+        # Check for completion
+        event_type = _field(payload, "event_type") or _field(event, "event_type")
+        if event_type in COMPLETE_EVENT_TYPES:
+            self.is_complete = True
+        
+        return events
+    
+    def _start_tool_call(self, tool_call: Any) -> List[AgentEvent]:
+        """Report a tool call as started (once per call_id)."""
+        call_id = _field(tool_call, "call_id")
+        if call_id is not None:
+            if call_id in self._started_calls:
+                return []
+            self._started_calls.add(call_id)
+        return [ToolCallStarted(
+            tool_name=_field(tool_call, "tool_name"),
+            call_id=call_id,
+            arguments=_field(tool_call, "arguments")
+        )]
+    
+    def _finish_tool_calls(self, tool_calls: Any, tool_responses: Any) -> List[AgentEvent]:
+        """Record finished tool calls and report them (started first if needed)."""
+        if not tool_calls:
+            return []
+        if not isinstance(tool_calls, list):
+            tool_calls = [tool_calls]
+        
+        responses = {
+            _field(response, "call_id"): _field(response, "content")
+            for response in (tool_responses or [])
+        }
+        
+        events: List[AgentEvent] = []
+        for tool_call in tool_calls:
+            call_id = _field(tool_call, "call_id")
+            if call_id is None or call_id not in self._started_calls:
+                events.extend(self._start_tool_call(tool_call))
+            events.append(ToolCallFinished(
+                tool_name=_field(tool_call, "tool_name"),
+                call_id=call_id,
+                response=responses.get(call_id)
+            ))
+            self.tool_calls.append(_to_plain(tool_call))
+        return events
+    
+    @property
+    def text(self) -> str:
+        """All text decoded so far."""
+        if len(self._parts) > 1:
+            # Collapse so repeated reads stay cheap
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
@@ -0,0 +1,145 @@
+"""
+Tool Result Cache
+
+This module provides a small TTL/LRU cache for the results of read-only
+tools. Entries are tagged with the services they describe, so a mutating
+tool call (restart, scale) only invalidates the entries it affects.
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Optional, Tuple
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+def affected_services(arguments: Dict[str, Any]) -> Optional[FrozenSet[str]]:
+    """
+    Get the services a tool call refers to.
+    
+    Understands the argument shapes used by the IT tools: service_name,
+    service_names and services (a list of {"service_name": ...} objects).
+    
+    Args:
+        arguments: Tool call arguments
+        
+    Returns:
+        Set of service names, or None if the call covers all services
+    """
+    names = set()
+    if "service_name" in arguments:
+        names.add(arguments["service_name"])
+    names.update(arguments.get("service_names") or ())
+    for item in arguments.get("services") or ():
+        if isinstance(item, dict) and "service_name" in item:
+            names.add(item["service_name"])
+    return frozenset(names) if names else None
+
+
+def cache_key(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    """Build the cache key for a tool call (argument order does not matter)."""
+    return tool_name, json.dumps(arguments, sort_keys=True, default=str)
+
+
+class ToolResultCache:
+    """
+    TTL/LRU cache of tool results.
+    
+    Each entry remembers the services its call referred to (None meaning
+    all services). invalidate(services) drops the entries that overlap
+    those services plus every all-services entry.
+    """
+    
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 256,
+        clock: Optional[Callable[[], float]] = None
+    ):
+        """
+        Initialize cache.
+        
+        Args:
+            ttl: Seconds an entry stays valid
+            max_size: Maximum number of entries (least recently used are evicted)
+            clock: Time source (default: time.monotonic)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock or time.monotonic
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[FrozenSet[str]], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Key from cache_key()
+            
+        Returns:
+            (found, result) tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+    
+    def put(self, key: Hashable, result: Any, services: Optional[FrozenSet[str]] = None):
+        """
+        Cache a result.
+        
+        Args:
+            key: Key from cache_key()
+            result: Tool result
+            services: Services the result describes (None = all services)
+        """
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, services, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, services: Optional[FrozenSet[str]] = None) -> int:
+        """
+        Drop entries affected by a change to some services.
+        
+        Args:
+            services: Changed services (None = everything may have changed)
+            
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if services is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            stale = [
+                key for key, (_, entry_services, _) in self._entries.items()
+                if entry_services is None or not entry_services.isdisjoint(services)
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+    
+    def clear(self):
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -5,14 +5,24 @@ Tools are the actions that agents can take. This module defines
 IT operations tools that agents can use with llamastack.
 """
 
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Sequence, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
+import copy
+import hashlib
+import json
+import threading
+import time
 
 # Handle both relative and absolute imports
 try:
     from .environment import SimulatedEnvironment
+    from .metrics import ToolHook, ToolMetrics
+    from .tool_cache import ToolResultCache, affected_services, cache_key
 except ImportError:
     from environment import SimulatedEnvironment
+    from metrics import ToolHook, ToolMetrics
+    from tool_cache import ToolResultCache, affected_services, cache_key
 
 
 @dataclass
@@ -21,11 +31,19 @@ class ITTool:
     Represents an IT operations tool for llamastack.
     
     Tools define what actions an agent can take and how to execute them.
+    max_concurrency limits how many calls of this tool ToolRegistry.execute_tools
+    runs at once, and timeout is the default per-call timeout in seconds.
+    Read-only tools can be marked cacheable; tools that change the
+    environment are marked mutating so they invalidate cached results.
     """
     name: str
     description: str
     func: Callable
     parameters: Dict[str, Any]
+    max_concurrency: Optional[int] = None
+    timeout: Optional[float] = None
+    cacheable: bool = False
+    mutating: bool = False
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert tool to dictionary for llamastack"""
@@ -35,6 +53,17 @@ class ITTool:
             "parameters": self.parameters
         }
     
+    def to_llamastack(self) -> Dict[str, Any]:
+        """Convert tool to llamastack format (OpenAI function calling format)"""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+        }
+    
     def execute(self, **kwargs) -> str:
         """Execute the tool function"""
         return self.func(**kwargs)
@@ -73,7 +102,8 @@ def create_tools(environment: SimulatedEnvironment) -> Dict[str, ITTool]:
                 }
             },
             "required": ["service_name"]
-        }
+        },
+        cacheable=True
     )
     
     # Restart Service Tool
@@ -98,7 +128,8 @@ def create_tools(environment: SimulatedEnvironment) -> Dict[str, ITTool]:
                 }
             },
             "required": ["service_name"]
-        }
+        },
+        mutating=True
     )
     
     # Scale Service Tool
@@ -107,8 +138,11 @@ def create_tools(environment: SimulatedEnvironment) -> Dict[str, ITTool]:
         if replicas < 1:
             return "❌ Error: Replicas must be at least 1"
         result = environment.scale_service(service_name, replicas)
-        if result["success"]:
+        if result["success"] and "cpu_usage" in result:
             return f"✅ {result['message']}. CPU: {result['cpu_usage']:.1f}%, Memory: {result['memory_usage']:.1f}%"
+        elif result["success"]:
+            # Scheduled in virtual time; metrics change once it completes
+            return f"✅ {result['message']}"
         else:
             return f"❌ {result['message']}"
     
@@ -129,7 +163,8 @@ def create_tools(environment: SimulatedEnvironment) -> Dict[str, ITTool]:
                 }
             },
             "required": ["service_name", "replicas"]
-        }
+        },
+        mutating=True
     )
     
     # Get All Services Tool
@@ -155,7 +190,130 @@ def create_tools(environment: SimulatedEnvironment) -> Dict[str, ITTool]:
             "type": "object",
             "properties": {},
             "required": []
-        }
+        },
+        cacheable=True
+    )
+    
+    # Batch Status Tool
+    def check_services_status(service_names: List[str]) -> str:
+        """Check the status of several IT services"""
+        statuses = environment.get_services_status(service_names)
+        result_lines = []
+        for service_name, result in statuses.items():
+            if result is None:
+                result_lines.append(f"Service '{service_name}' not found")
+            else:
+                result_lines.append(
+                    f"Service '{service_name}': Status={result['status']}, "
+                    f"CPU={result['cpu_usage']:.1f}%, Memory={result['memory_usage']:.1f}%"
+                )
+        return "\n".join(result_lines) or "No services given"
+    
+    tools["check_services_status"] = ITTool(
+        name="check_services_status",
+        description="Check the status of several IT services in one call. Prefer this over calling check_service_status repeatedly. Args: service_names (list of str) - The names of the services to check",
+        func=check_services_status,
+        parameters={
+            "type": "object",
+            "properties": {
+                "service_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The names of the services to check"
+                }
+            },
+            "required": ["service_names"]
+        },
+        cacheable=True
+    )
+    
+    # Batch Restart Tool
+    def restart_services(service_names: List[str]) -> str:
+        """Restart several IT services concurrently"""
+        result = environment.restart_services(service_names)
+        result_lines = [f"{'✅' if result['success'] else '⚠️'} {result['message']}"]
+        for item in result["results"]:
+            if item["success"]:
+                result_lines.append(f"✅ {item['message']}. Restart count: {item.get('restart_count', 0)}")
+            else:
+                result_lines.append(f"❌ {item['message']}")
+        return "\n".join(result_lines)
+    
+    tools["restart_services"] = ITTool(
+        name="restart_services",
+        description="Restart several IT services at once. The restarts run concurrently, so this is faster than calling restart_service for each service. Use this when multiple services have failed or are degraded. Args: service_names (list of str) - The names of the services to restart",
+        func=restart_services,
+        parameters={
+            "type": "object",
+            "properties": {
+                "service_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The names of the services to restart"
+                }
+            },
+            "required": ["service_names"]
+        },
+        mutating=True
+    )
+    
+    # Batch Scale Tool
+    def scale_services(services: List[Dict[str, Any]]) -> str:
+        """Scale several services"""
+        if not isinstance(services, list):
+            return "❌ Error: services must be a list of objects with service_name and replicas"
+        replicas_by_service = {}
+        for item in services:
+            if not isinstance(item, dict) or not isinstance(item.get("service_name"), str):
+                return f"❌ Error: Each service needs a service_name string (got {item!r})"
+            replicas = item.get("replicas")
+            if isinstance(replicas, bool) or not isinstance(replicas, int):
+                return f"❌ Error: Replicas must be an integer (service '{item['service_name']}')"
+            if replicas < 1:
+                return f"❌ Error: Replicas must be at least 1 (service '{item['service_name']}')"
+            replicas_by_service[item["service_name"]] = replicas
+        result = environment.scale_services(replicas_by_service)
+        result_lines = [f"{'✅' if result['success'] else '⚠️'} {result['message']}"]
+        for item in result["results"]:
+            if item["success"] and "cpu_usage" in item:
+                result_lines.append(
+                    f"✅ {item['message']}. CPU: {item['cpu_usage']:.1f}%, Memory: {item['memory_usage']:.1f}%"
+                )
+            elif item["success"]:
+                result_lines.append(f"✅ {item['message']}")
+            else:
+                result_lines.append(f"❌ {item['message']}")
+        return "\n".join(result_lines)
+    
+    tools["scale_services"] = ITTool(
+        name="scale_services",
+        description="Scale several services in one call by changing their number of replicas. Use this when multiple services are experiencing high load. Args: services (list of objects) - Each with service_name (str) and replicas (int, minimum 1)",
+        func=scale_services,
+        parameters={
+            "type": "object",
+            "properties": {
+                "services": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "service_name": {
+                                "type": "string",
+                                "description": "The name of the service to scale"
+                            },
+                            "replicas": {
+                                "type": "integer",
+                                "description": "Number of replicas (minimum 1)"
+                            }
+                        },
+                        "required": ["service_name", "replicas"]
+                    },
+                    "description": "The services to scale and their replica counts"
+                }
+            },
+            "required": ["services"]
+        },
+        mutating=True
     )
     
     return tools
@@ -165,18 +323,129 @@ class ToolRegistry:
     """
     Registry for managing available tools for llamastack agents.
     
-    This class helps organize and provide tools to agents.
+    This class helps organize and provide tools to agents. Tool definitions
+    are frozen when a tool is registered: the llamastack schema is copied
+    and serialized once, and the combined schema blob, its hash and the
+    registry version only change when tools are registered or removed.
     """
     
-    def __init__(self, environment: SimulatedEnvironment):
+    def __init__(
+        self,
+        environment: SimulatedEnvironment,
+        recorder: Optional[Any] = None,
+        max_workers: int = 8,
+        cache_ttl: Optional[float] = None,
+        cache_size: int = 256,
+        hooks: Optional[Sequence[ToolHook]] = None,
+        metrics: bool = True
+    ):
         """
         Initialize tool registry.
         
         Args:
             environment: The simulated environment to interact with
+            recorder: Optional EpisodeRecorder that every tool call is recorded to
+            max_workers: Threads used by execute_tools to run calls concurrently
+            cache_ttl: Seconds results of cacheable tools are reused (None disables caching).
+                In virtual time this is measured on the simulation clock. A result is
+                never reused once the environment's state_version has changed.
+            cache_size: Maximum number of cached results
+            hooks: ToolHooks called around every tool call
+            metrics: Collect per-tool call counts, errors and latencies in self.metrics
         """
         self.environment = environment
-        self._tools: Dict[str, ITTool] = create_tools(environment)
+        self.recorder = recorder
+        self.hooks: List[ToolHook] = list(hooks or [])
+        self.metrics: Optional[ToolMetrics] = ToolMetrics() if metrics else None
+        if self.metrics is not None:
+            self.hooks.append(self.metrics)
+        if recorder is not None:
+            self.hooks.append(recorder)
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.cache: Optional[ToolResultCache] = None
+        if cache_ttl is not None:
+            if getattr(environment, "virtual_time", False):
+                clock = lambda: environment.time
+            else:
+                clock = None
+            self.cache = ToolResultCache(cache_ttl, max_size=cache_size, clock=clock)
+        self._tools: Dict[str, ITTool] = {}
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._schema_blobs: Dict[str, str] = {}
+        self.version = 0
+        for tool in create_tools(environment).values():
+            self._add_tool(tool)
+        self._refresh()
+        for hook in self.hooks:
+            hook.attached(self)
+    
+    def register_tool(self, tool: ITTool, replace: bool = False):
+        """
+        Register a tool (or replace an existing one).
+        
+        Args:
+            tool: Tool to register
+            replace: Allow replacing a tool with the same name
+        """
+        with self._lock:
+            if tool.name in self._tools and not replace:
+                raise ValueError(f"Tool '{tool.name}' is already registered")
+            replaced = tool.name in self._tools
+            self._add_tool(tool)
+            self._refresh()
+        if replaced:
+            self._forget_tool_state(tool.name)
+    
+    def unregister_tool(self, name: str) -> Optional[ITTool]:
+        """
+        Remove a tool.
+        
+        Args:
+            name: Name of the tool
+            
+        Returns:
+            The removed tool, or None if it was not registered
+        """
+        with self._lock:
+            tool = self._tools.pop(name, None)
+            if tool is None:
+                return None
+            del self._definitions[name]
+            del self._schema_blobs[name]
+            self._refresh()
+        self._forget_tool_state(name)
+        return tool
+    
+    def _add_tool(self, tool: ITTool):
+        """Freeze a tool's definition and serialized schema"""
+        definition = copy.deepcopy(tool.to_llamastack())
+        self._tools[tool.name] = tool
+        self._definitions[tool.name] = definition
+        self._schema_blobs[tool.name] = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    
+    def _refresh(self):
+        """Rebuild the combined tool lists, schema blob and hash"""
+        self._llamastack_tools = list(self._definitions.values())
+        self._tool_list = [
+            {
+                "name": tool.name,
+                "description": tool.description
+            }
+            for tool in self._tools.values()
+        ]
+        self.schema_blob = "[" + ",".join(self._schema_blobs.values()) + "]"
+        self.schema_hash = hashlib.sha256(self.schema_blob.encode("utf-8")).hexdigest()
+        self.version += 1
+    
+    def _forget_tool_state(self, name: str):
+        """Drop concurrency limits and cached results of a replaced or removed tool"""
+        with self._lock:
+            self._limits.pop(name, None)
+        if self.cache is not None:
+            self.cache.clear()
     
     def get_tool(self, name: str) -> Optional[ITTool]:
         """
@@ -192,28 +461,19 @@ class ToolRegistry:
     
     def get_all_tools(self) -> Dict[str, ITTool]:
         """Get all registered tools"""
-        return self._tools
+        return dict(self._tools)
     
     def get_tools_for_llamastack(self) -> list[Dict[str, Any]]:
         """
         Get tools in llamastack format (OpenAI function calling format).
         
+        The definitions are precomputed at registration and shared between
+        calls, so treat them as read-only.
+        
         Returns:
             List of tool definitions for llamastack API in OpenAI format
         """
-        tools = []
-        for tool in self._tools.values():
-            # LlamaStack expects OpenAI function calling format
-            tool_def = {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.parameters
-                }
-            }
-            tools.append(tool_def)
-        return tools
+        return list(self._llamastack_tools)
     
     def execute_tool(self, tool_name: str, **kwargs) -> str:
         """
@@ -229,7 +489,160 @@ class ToolRegistry:
         tool = self.get_tool(tool_name)
         if tool is None:
             return f"Tool '{tool_name}' not found"
-        return tool.execute(**kwargs)
+        
+        hooks = self.hooks
+        for hook in hooks:
+            hook.before_call(tool_name, kwargs)
+        
+        result = None
+        error = None
+        start = time.perf_counter()
+        try:
+            result = self._call_tool(tool, kwargs)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for hook in hooks:
+                hook.after_call(tool_name, kwargs, result, error, duration)
+    
+    def add_hook(self, hook: ToolHook):
+        """Add a hook called around every tool call"""
+        with self._lock:
+            self.hooks = self.hooks + [hook]
+        hook.attached(self)
+    
+    def remove_hook(self, hook: ToolHook):
+        """Remove a previously added hook"""
+        with self._lock:
+            self.hooks = [h for h in self.hooks if h is not hook]
+    
+    def _call_tool(self, tool: ITTool, kwargs: Dict[str, Any]) -> str:
+        """Run a tool, going through the result cache when enabled"""
+        if self.cache is not None and tool.cacheable:
+            # Keyed on the environment's state version (read before the tool
+            # runs), so results never outlive a state change: scheduled
+            # restarts and scenario events included, and a read racing a
+            # mutation stores its result under the old, unreachable version
+            key = (cache_key(tool.name, kwargs), getattr(self.environment, "state_version", None))
+            found, result = self.cache.get(key)
+            if not found:
+                result = tool.execute(**kwargs)
+                self.cache.put(key, result, affected_services(kwargs))
+            return result
+        
+        result = tool.execute(**kwargs)
+        if self.cache is not None and tool.mutating:
+            self.cache.invalidate(affected_services(kwargs))
+        return result
+    
+    def execute_tools(
+        self,
+        calls: Sequence[Union[Dict[str, Any], Tuple[str, Dict[str, Any]]]],
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """
+        Execute several tool calls concurrently.
+        
+        Calls run on a thread pool, with at most tool.max_concurrency calls
+        of the same tool at once. A call that cannot be parsed, fails or
+        times out yields an error message instead of raising, so the other
+        calls still complete.
+        A timed-out call keeps running in the background (threads cannot be
+        cancelled) but its result is discarded.
+        
+        Args:
+            calls: Tool calls as {"tool_name", "arguments"} dicts (e.g. the
+                tool_calls collected from an agent turn; arguments may be a
+                JSON string) or (tool_name, arguments) tuples
+            timeout: Per-call timeout in seconds, measured from submission
+                (overrides tool.timeout; None = tool default or no limit)
+            
+        Returns:
+            Results in call order
+        """
+        if not calls:
+            return []
+        
+        executor = self._get_executor()
+        started = time.monotonic()
+        # One (tool_name, future) per call; a call that cannot be parsed gets
+        # its error message instead of a future
+        pending = []
+        for call in calls:
+            try:
+                tool_name, arguments = self._parse_call(call)
+            except Exception as e:
+                pending.append((None, f"❌ Invalid tool call: {e}"))
+                continue
+            pending.append((tool_name, executor.submit(self._execute_limited, tool_name, arguments)))
+        
+        results = []
+        for tool_name, future in pending:
+            if isinstance(future, str):
+                results.append(future)
+                continue
+            tool = self.get_tool(tool_name)
+            call_timeout = timeout if timeout is not None else (tool.timeout if tool else None)
+            try:
+                if call_timeout is None:
+                    results.append(future.result())
+                else:
+                    remaining = max(0.0, started + call_timeout - time.monotonic())
+                    results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                results.append(f"❌ Tool '{tool_name}' timed out after {call_timeout}s")
+            except Exception as e:
+                results.append(f"❌ Error executing tool '{tool_name}': {e}")
+        return results
+    
+    @staticmethod
+    def _parse_call(call: Union[Dict[str, Any], Tuple[str, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """Normalize a tool call to (tool_name, arguments)"""
+        if isinstance(call, dict):
+            tool_name = call.get("tool_name") or call.get("name")
+            arguments = call.get("arguments") or {}
+        else:
+            tool_name, arguments = call
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except ValueError as e:
+                raise ValueError(f"arguments for tool '{tool_name}' are not valid JSON ({e})")
+        if not isinstance(arguments, dict):
+            raise ValueError(f"arguments for tool '{tool_name}' must be an object, got {type(arguments).__name__}")
+        return tool_name, dict(arguments)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="tool"
+                )
+            return self._executor
+    
+    def _execute_limited(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Execute a tool while holding its concurrency limit (if any)"""
+        tool = self.get_tool(tool_name)
+        if tool is None or not tool.max_concurrency:
+            return self.execute_tool(tool_name, **arguments)
+        
+        with self._lock:
+            limit = self._limits.get(tool_name)
+            if limit is None:
+                limit = self._limits[tool_name] = threading.BoundedSemaphore(tool.max_concurrency)
+        with limit:
+            return self.execute_tool(tool_name, **arguments)
+    
+    def close(self):
+        """Shut down the thread pool used by execute_tools"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
     
     def list_tools(self) -> list[Dict[str, str]]:
         """
@@ -238,11 +651,5 @@ class ToolRegistry:
         Returns:
             List of tool information dictionaries
         """
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description
-            }
-            for tool in self._tools.values()
-        ]
+        return list(self._tool_list)
 
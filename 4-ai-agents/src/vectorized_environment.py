@@ -0,0 +1,456 @@
+"""
+Vectorized Simulated IT Environment
+
+This module provides a NumPy-backed variant of SimulatedEnvironment for
+load testing agents against fleet-sized environments (100k+ services).
+Service state is held in arrays instead of one Service object per name,
+and tick() advances the whole fleet with vectorized drift, failures and
+degradation.
+"""
+
+from typing import Dict, List, Optional, Any, Sequence
+import itertools
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    # Checked when a VectorizedEnvironment is created
+    np = None
+
+# Handle both relative and absolute imports
+try:
+    from .action_log import ActionLog
+    from .environment import ServiceStatus, _batch_result
+except ImportError:
+    from action_log import ActionLog
+    from environment import ServiceStatus, _batch_result
+
+
+# Status codes stored in the status array
+_STATUSES = list(ServiceStatus)
+_CODE = {status: code for code, status in enumerate(_STATUSES)}
+RUNNING = _CODE[ServiceStatus.RUNNING]
+DEGRADED = _CODE[ServiceStatus.DEGRADED]
+FAILED = _CODE[ServiceStatus.FAILED]
+
+
+class VectorizedEnvironment:
+    """
+    Fleet-sized simulated IT environment backed by NumPy arrays.
+    
+    Offers the same service API as SimulatedEnvironment (get_service_status,
+    get_all_services, restart_service, scale_service, the batch variants,
+    simulate_failure, simulate_degradation, get_action_log, reset), so it
+    can be passed to create_tools / ToolRegistry unchanged.
+    """
+    
+    def __init__(
+        self,
+        num_services: Optional[int] = None,
+        service_names: Optional[Sequence[str]] = None,
+        seed: Optional[int] = None,
+        failure_rate: float = 0.0001,
+        degradation_rate: float = 0.001,
+        restart_delay: float = 0.0,
+        action_log_capacity: Optional[int] = 100000,
+        action_log_spill_path: Optional[str] = None
+    ):
+        """
+        Initialize vectorized environment.
+        
+        Args:
+            num_services: Number of services to create (named service-000000, ...)
+            service_names: Explicit service names (takes precedence over num_services)
+            seed: Seed for the random generator (None = nondeterministic)
+            failure_rate: Probability per tick that a running service fails
+            degradation_rate: Probability per tick that a running service degrades
+            restart_delay: Seconds restart_service sleeps (0 = instant, for load tests)
+            action_log_capacity: Maximum action log entries kept in memory (None = unbounded)
+            action_log_spill_path: Optional JSONL file that evicted log entries are appended to
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required for VectorizedEnvironment. Install it with: pip install numpy"
+            )
+        
+        if service_names is None:
+            if num_services is None:
+                service_names = [
+                    "web-server",
+                    "database",
+                    "cache-service",
+                    "api-gateway",
+                    "monitoring-service"
+                ]
+            else:
+                service_names = [f"service-{i:06d}" for i in range(num_services)]
+        
+        self.service_names: List[str] = list(service_names)
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.service_names)}
+        self.failure_rate = failure_rate
+        self.degradation_rate = degradation_rate
+        self.restart_delay = restart_delay
+        self.rng = np.random.default_rng(seed)
+        self.action_log = ActionLog(action_log_capacity, action_log_spill_path)
+        self.time: float = time.time()
+        
+        n = len(self.service_names)
+        self.status = np.full(n, RUNNING, dtype=np.int8)
+        self.cpu_usage = np.zeros(n, dtype=np.float64)
+        self.memory_usage = np.zeros(n, dtype=np.float64)
+        self.restart_count = np.zeros(n, dtype=np.int32)
+        self.last_restart = np.full(n, np.nan, dtype=np.float64)
+        
+        # Bumped after every change to service state (see SimulatedEnvironment)
+        self.state_version = 0
+        self._state_versions = itertools.count(1)
+    
+    def __len__(self) -> int:
+        """Number of services"""
+        return len(self.service_names)
+    
+    def _service_dict(self, i: int) -> Dict[str, Any]:
+        """Build the status dictionary for service i"""
+        last_restart = self.last_restart[i]
+        return {
+            "name": self.service_names[i],
+            "status": _STATUSES[self.status[i]].value,
+            "cpu_usage": float(self.cpu_usage[i]),
+            "memory_usage": float(self.memory_usage[i]),
+            "last_restart": None if np.isnan(last_restart) else float(last_restart),
+            "restart_count": int(self.restart_count[i]),
+        }
+    
+    def _not_found(self, action: Optional[str], service_name: str) -> Dict[str, Any]:
+        """Build (and optionally log) a service-not-found result"""
+        result = {
+            "success": False,
+            "message": f"Service '{service_name}' not found",
+            "service_name": service_name
+        }
+        if action:
+            self._log_action(action, result)
+        return result
+    
+    def tick(self, dt: float = 1.0) -> Dict[str, int]:
+        """
+        Advance the whole fleet by one simulation step.
+        
+        Metrics drift randomly, and running services fail or degrade with
+        probability failure_rate / degradation_rate (scaled by dt).
+        
+        Args:
+            dt: Simulated seconds covered by the step
+            
+        Returns:
+            Number of services that failed and degraded during the step
+        """
+        n = len(self.service_names)
+        self.time += dt
+        
+        alive = self.status != FAILED
+        self.cpu_usage += np.where(alive, self.rng.uniform(-5, 5, n), 0.0)
+        self.memory_usage += np.where(alive, self.rng.uniform(-2, 2, n), 0.0)
+        np.clip(self.cpu_usage, 0, 100, out=self.cpu_usage)
+        np.clip(self.memory_usage, 0, 100, out=self.memory_usage)
+        
+        draws = self.rng.random(n)
+        running = self.status == RUNNING
+        failed = running & (draws < self.failure_rate * dt)
+        degraded = running & ~failed & (draws < (self.failure_rate + self.degradation_rate) * dt)
+        
+        self.status[failed] = FAILED
+        self.cpu_usage[failed] = 0.0
+        self.memory_usage[failed] = 0.0
+        
+        count = int(degraded.sum())
+        self.status[degraded] = DEGRADED
+        self.cpu_usage[degraded] = self.rng.uniform(85, 95, count)
+        self.memory_usage[degraded] = self.rng.uniform(80, 90, count)
+        self._state_changed()
+        
+        return {"failed": int(failed.sum()), "degraded": count}
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """Get the number of services in each status"""
+        counts = np.bincount(self.status, minlength=len(_STATUSES))
+        return {status.value: int(counts[code]) for code, status in enumerate(_STATUSES)}
+    
+    def get_unhealthy_services(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Get names of failed or degraded services.
+        
+        Args:
+            limit: Maximum number of names to return
+            
+        Returns:
+            List of service names, in fleet order
+        """
+        indices = np.flatnonzero((self.status == FAILED) | (self.status == DEGRADED))
+        if limit is not None:
+            indices = indices[:limit]
+        return [self.service_names[i] for i in indices]
+    
+    def get_service_status(self, service_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get status of a service.
+        
+        Args:
+            service_name: Name of the service
+            
+        Returns:
+            Service status dictionary or None if service doesn't exist
+        """
+        i = self._index.get(service_name)
+        if i is None:
+            return None
+        
+        # Simulate some variability in metrics
+        cpu, memory = self.rng.uniform((-5, -2), (5, 2))
+        self.cpu_usage[i] = max(0, min(100, self.cpu_usage[i] + cpu))
+        self.memory_usage[i] = max(0, min(100, self.memory_usage[i] + memory))
+        
+        return self._service_dict(i)
+    
+    def get_all_services(self) -> List[Dict[str, Any]]:
+        """Get status of all services"""
+        return [self._service_dict(i) for i in range(len(self.service_names))]
+    
+    def get_services_status(self, service_names: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get status of several services at once.
+        
+        Args:
+            service_names: Names of the services
+            
+        Returns:
+            Dictionary of service name to status dictionary (None if the service doesn't exist)
+        """
+        return {name: self.get_service_status(name) for name in dict.fromkeys(service_names)}
+    
+    def restart_service(self, service_name: str) -> Dict[str, Any]:
+        """
+        Restart a service.
+        
+        Args:
+            service_name: Name of the service to restart
+            
+        Returns:
+            Result dictionary with success status and message
+        """
+        i = self._index.get(service_name)
+        if i is None:
+            return self._not_found("restart_service", service_name)
+        
+        if self.restart_delay:
+            time.sleep(self.restart_delay)
+        
+        self.status[i] = RUNNING
+        self.last_restart[i] = time.time()
+        self.restart_count[i] += 1
+        self.cpu_usage[i] = self.rng.uniform(10, 30)
+        self.memory_usage[i] = self.rng.uniform(20, 40)
+        self._state_changed()
+        
+        result = {
+            "success": True,
+            "message": f"Service '{service_name}' restarted successfully",
+            "service_name": service_name,
+            "status": ServiceStatus.RUNNING.value,
+            "restart_count": int(self.restart_count[i])
+        }
+        self._log_action("restart_service", result)
+        return result
+    
+    def restart_services(self, service_names: Sequence[str]) -> Dict[str, Any]:
+        """
+        Restart several services concurrently (one restart_delay for the batch).
+        
+        Args:
+            service_names: Names of the services to restart
+            
+        Returns:
+            Aggregated result dictionary with per-service results
+        """
+        names = list(dict.fromkeys(service_names))
+        found = [self._index[name] for name in names if name in self._index]
+        if found and self.restart_delay:
+            time.sleep(self.restart_delay)
+        
+        indices = np.array(found, dtype=np.intp)
+        self.status[indices] = RUNNING
+        self.last_restart[indices] = time.time()
+        self.restart_count[indices] += 1
+        self.cpu_usage[indices] = self.rng.uniform(10, 30, len(indices))
+        self.memory_usage[indices] = self.rng.uniform(20, 40, len(indices))
+        self._state_changed()
+        
+        results = []
+        for name in names:
+            i = self._index.get(name)
+            if i is None:
+                results.append(self._not_found("restart_service", name))
+                continue
+            result = {
+                "success": True,
+                "message": f"Service '{name}' restarted successfully",
+                "service_name": name,
+                "status": ServiceStatus.RUNNING.value,
+                "restart_count": int(self.restart_count[i])
+            }
+            self._log_action("restart_service", result)
+            results.append(result)
+        return _batch_result("Restart", results)
+    
+    def scale_service(self, service_name: str, replicas: int) -> Dict[str, Any]:
+        """
+        Scale a service (simulated - just updates metrics).
+        
+        Args:
+            service_name: Name of the service
+            replicas: Number of replicas
+            
+        Returns:
+            Result dictionary
+        """
+        i = self._index.get(service_name)
+        if i is None:
+            return self._not_found("scale_service", service_name)
+        
+        # Simulate scaling effect on metrics
+        if replicas > 1:
+            self.cpu_usage[i] = max(0, self.cpu_usage[i] - 10 * (replicas - 1))
+            self.memory_usage[i] = max(0, self.memory_usage[i] - 5 * (replicas - 1))
+            self._state_changed()
+        
+        result = {
+            "success": True,
+            "message": f"Service '{service_name}' scaled to {replicas} replicas",
+            "service_name": service_name,
+            "replicas": replicas,
+            "cpu_usage": float(self.cpu_usage[i]),
+            "memory_usage": float(self.memory_usage[i])
+        }
+        self._log_action("scale_service", result)
+        return result
+    
+    def scale_services(self, replicas_by_service: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Scale several services at once.
+        
+        Args:
+            replicas_by_service: Dictionary of service name to number of replicas
+            
+        Returns:
+            Aggregated result dictionary with per-service results
+        """
+        return _batch_result("Scale", [
+            self.scale_service(name, replicas) for name, replicas in replicas_by_service.items()
+        ])
+    
+    def simulate_failure(self, service_name: str) -> Dict[str, Any]:
+        """
+        Simulate a service failure (for testing purposes).
+        
+        Args:
+            service_name: Name of the service to fail
+            
+        Returns:
+            Result dictionary
+        """
+        i = self._index.get(service_name)
+        if i is None:
+            return {
+                "success": False,
+                "message": f"Service '{service_name}' not found"
+            }
+        
+        self.status[i] = FAILED
+        self.cpu_usage[i] = 0.0
+        self.memory_usage[i] = 0.0
+        self._state_changed()
+        
+        result = {
+            "success": True,
+            "message": f"Simulated failure for service '{service_name}'",
+            "service_name": service_name,
+            "status": ServiceStatus.FAILED.value
+        }
+        self._log_action("simulate_failure", result)
+        return result
+    
+    def simulate_degradation(self, service_name: str) -> Dict[str, Any]:
+        """
+        Simulate service degradation (high CPU/memory).
+        
+        Args:
+            service_name: Name of the service
+            
+        Returns:
+            Result dictionary
+        """
+        i = self._index.get(service_name)
+        if i is None:
+            return {
+                "success": False,
+                "message": f"Service '{service_name}' not found"
+            }
+        
+        self.status[i] = DEGRADED
+        self.cpu_usage[i] = self.rng.uniform(85, 95)
+        self.memory_usage[i] = self.rng.uniform(80, 90)
+        self._state_changed()
+        
+        result = {
+            "success": True,
+            "message": f"Simulated degradation for service '{service_name}'",
+            "service_name": service_name,
+            "status": ServiceStatus.DEGRADED.value,
+            "cpu_usage": float(self.cpu_usage[i]),
+            "memory_usage": float(self.memory_usage[i])
+        }
+        self._log_action("simulate_degradation", result)
+        return result
+    
+    def _state_changed(self):
+        """Record a change to service state (cached tool results become stale)"""
+        self.state_version = next(self._state_versions)
+    
+    def _log_action(self, action_type: str, result: Dict[str, Any]):
+        """Log an action for audit purposes"""
+        self.action_log.append({
+            "timestamp": time.time(),
+            "action": action_type,
+            "result": result
+        })
+    
+    def get_action_log(
+        self,
+        limit: Optional[int] = None,
+        service_name: Optional[str] = None,
+        action: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get action log.
+        
+        Args:
+            limit: Maximum number of entries to return
+            service_name: Only return entries for this service
+            action: Only return entries of this action type
+            
+        Returns:
+            List of action log entries
+        """
+        return self.action_log.get(limit, service_name=service_name, action=action)
+    
+    def reset(self):
+        """Reset environment to initial state"""
+        n = len(self.service_names)
+        self.status[:] = RUNNING
+        self.cpu_usage[:] = self.rng.uniform(10, 30, n)
+        self.memory_usage[:] = self.rng.uniform(20, 40, n)
+        self.restart_count[:] = 0
+        self.last_restart[:] = np.nan
+        self.action_log.clear()
+        self._state_changed()
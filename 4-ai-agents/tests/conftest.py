@@ -0,0 +1,6 @@
+"""Make the module's src directory importable from the tests."""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
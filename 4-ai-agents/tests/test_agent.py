@@ -0,0 +1,110 @@
+"""Tests for AsyncAutonomousAgent session and agent recovery."""
+
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+
+pytest.importorskip("llama_stack_client")
+
+from agent import AsyncAutonomousAgent  # noqa: E402
+from agent_cache import AgentCache  # noqa: E402
+from environment import SimulatedEnvironment  # noqa: E402
+from tools import ToolRegistry  # noqa: E402
+
+
+class FakeAgentsAPI:
+    """Async stand-in for client.alpha.agents that forgets agents on restart."""
+    
+    def __init__(self, known_agents):
+        self.known_agents = set(known_agents)
+        self.calls = []
+        self._next_id = 0
+        self.session = SimpleNamespace(create=self._create_session, delete=self._delete_session)
+        self.turn = SimpleNamespace(create=self._create_turn)
+    
+    def _new_id(self, prefix):
+        self._next_id += 1
+        return f"{prefix}-{self._next_id}"
+    
+    async def create(self, agent_config):
+        agent_id = self._new_id("agent")
+        self.known_agents.add(agent_id)
+        self.calls.append(("agent", agent_id))
+        return SimpleNamespace(agent_id=agent_id)
+    
+    async def _create_session(self, agent_id, session_name):
+        self.calls.append(("session", agent_id))
+        if agent_id not in self.known_agents:
+            raise RuntimeError(f"session: unknown agent {agent_id}")
+        return SimpleNamespace(session_id=self._new_id("session"))
+    
+    async def _delete_session(self, session_id, agent_id):
+        self.calls.append(("delete", agent_id))
+    
+    async def _create_turn(self, agent_id, session_id, messages, stream):
+        self.calls.append(("turn", agent_id))
+        if agent_id not in self.known_agents:
+            raise RuntimeError(f"turn: unknown agent {agent_id}")
+        
+        async def chunks():
+            yield SimpleNamespace(event=SimpleNamespace(payload=SimpleNamespace(
+                event_type="step_progress",
+                delta=SimpleNamespace(type="text", text="done")
+            )))
+            yield SimpleNamespace(event=SimpleNamespace(payload=SimpleNamespace(
+                event_type="turn_complete", turn=None
+            )))
+        return chunks()
+
+
+def make_agent(agent_cache, **kwargs):
+    registry = ToolRegistry(SimulatedEnvironment(seed=0))
+    return AsyncAutonomousAgent(registry, verbose=False, agent_cache=agent_cache, **kwargs)
+
+
+def test_stale_cached_agent_is_registered_again_for_the_turn():
+    agent_cache = AgentCache()
+    agent_cache.put(make_agent(agent_cache)._agent_cache_key, "stale")
+    agent = make_agent(agent_cache)
+    assert agent.agent_id == "stale"
+    
+    agents_api = FakeAgentsAPI(known_agents=[])
+    agent.client = SimpleNamespace(
+        models=SimpleNamespace(list=lambda: asyncio.sleep(0, [])),
+        alpha=SimpleNamespace(agents=agents_api)
+    )
+    
+    result = asyncio.run(agent.arun("check services"))
+    
+    assert result["success"], result
+    assert agents_api.calls == [
+        ("session", "stale"),
+        ("agent", "agent-1"),
+        ("session", "agent-1"),
+        ("turn", "agent-1"),
+        ("delete", "agent-1"),
+    ]
+    assert agent_cache.get(agent._agent_cache_key) == "agent-1"
+
+
+def test_reregistration_drops_sessions_of_the_old_agent():
+    agent_cache = AgentCache()
+    agent_cache.put(make_agent(agent_cache)._agent_cache_key, "stale")
+    agent = make_agent(agent_cache, session_pool_size=2)
+    agent.session_pool.checkin("old-pooled")
+    agent.session_pool.checkin("old-sticky", "incident-1")
+    
+    agents_api = FakeAgentsAPI(known_agents=[])
+    agent.client = SimpleNamespace(
+        models=SimpleNamespace(list=lambda: asyncio.sleep(0, [])),
+        alpha=SimpleNamespace(agents=agents_api)
+    )
+    
+    result = asyncio.run(agent.arun("check services", session_key="incident-2"))
+    
+    assert result["success"], result
+    assert agent.session_pool.checkout() is None
+    assert agent.session_pool.checkout("incident-1") is None
+    assert agent.session_pool.checkout("incident-2") == result["session_id"]
+    assert ("delete", "agent-1") not in agents_api.calls
@@ -0,0 +1,44 @@
+"""Tests for episode recording and replay."""
+
+from environment import SimulatedEnvironment
+from scenario import EpisodeRecorder, Scenario, ScenarioEvent, replay_episode
+from tools import ToolRegistry
+
+
+def record_episode(environment, cache_ttl=None):
+    scenario = Scenario([ScenarioEvent(at=3.0, action="degradation", service_name="database")])
+    recorder = EpisodeRecorder(environment, scenario)
+    registry = ToolRegistry(environment, recorder=recorder, cache_ttl=cache_ttl)
+    recorder.start()
+    
+    for _ in range(4):
+        # Repeated reads within the TTL are answered from the cache
+        registry.execute_tool("check_service_status", service_name="database")
+        registry.execute_tool("check_service_status", service_name="database")
+        environment.advance(2.0)
+    registry.execute_tool("restart_service", service_name="database")
+    environment.advance(1.0)
+    registry.execute_tool("check_service_status", service_name="database")
+    return recorder.to_dict()
+
+
+def test_episode_recorded_with_cache_replays_identically():
+    episode = record_episode(SimulatedEnvironment(virtual_time=True, seed=7), cache_ttl=5.0)
+    assert episode["config"]["cache_ttl"] == 5.0
+    
+    result = replay_episode(episode)
+    
+    assert result["tool_calls"] == 10
+    assert result["mismatches"] == []
+
+
+def test_episode_recorded_on_used_environment_replays_identically():
+    environment = SimulatedEnvironment(virtual_time=True, seed=7, restart_duration=5.0)
+    environment.get_service_status("web-server")
+    environment.simulate_failure("api-gateway")
+    environment.restart_service("api-gateway")
+    environment.advance(1.0)
+    
+    result = replay_episode(record_episode(environment))
+    
+    assert result["mismatches"] == []
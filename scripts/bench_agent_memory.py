@@ -0,0 +1,117 @@
+"""
+Agent Memory Benchmark
+
+Measures the bytes allocated per remembered action in AgentMemory (traced
+with tracemalloc), next to the plain, non-slotted dataclass records the
+memory used before, and the extra allocation ProblemMemory.to_dict()
+makes per solution action.
+
+Usage:
+    python scripts/bench_agent_memory.py [--actions 1000000]
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "4-ai-agents" / "src"))
+
+from memory import ActionMemory, AgentMemory, ProblemMemory  # noqa: E402
+
+ACTION_TYPES = ("restart_service", "scale_service", "check_service_status")
+
+
+@dataclass
+class PlainActionMemory:
+    """ActionMemory as it was before: a regular dataclass with a __dict__"""
+    timestamp: float
+    action_type: str
+    action_params: Dict[str, Any]
+    result: Dict[str, Any]
+    success: bool
+    context: str = ""
+
+
+def action_fields(i: int) -> Dict[str, Any]:
+    """Fields of the i-th action (small params/result dicts, like the IT tools produce)"""
+    service_name = f"service-{i % 100}"
+    return {
+        "timestamp": 1700000000.0 + i,
+        # Built per action, as parsed tool calls are, so the string is not shared
+        "action_type": "".join(ACTION_TYPES[i % len(ACTION_TYPES)]),
+        "action_params": {"service_name": service_name},
+        "result": {"success": True, "message": f"Service {service_name} restarted"},
+        "success": i % 10 != 0,
+    }
+
+
+def traced_bytes(build: Callable[[int], Any], count: int) -> float:
+    """Bytes still allocated per item after building count items"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def build_memory(count: int) -> AgentMemory:
+    memory = AgentMemory()
+    for i in range(count):
+        fields = action_fields(i)
+        memory.remember_action(
+            fields["action_type"],
+            fields["action_params"],
+            fields["result"],
+            fields["success"]
+        )
+    return memory
+
+
+def build_plain_records(count: int) -> list:
+    return [PlainActionMemory(**action_fields(i)) for i in range(count)]
+
+
+def build_slotted_records(count: int) -> list:
+    return [ActionMemory(**action_fields(i)) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bytes per remembered action")
+    parser.add_argument("--actions", type=int, default=1_000_000, help="Actions to remember")
+    args = parser.parse_args()
+    count = args.actions
+    
+    print(f"{count} actions (tracemalloc, bytes per action)")
+    for name, build in (
+        ("AgentMemory.remember_action", build_memory),
+        ("slotted ActionMemory records", build_slotted_records),
+        ("plain dataclass records", build_plain_records),
+    ):
+        start = time.perf_counter()
+        per_action = traced_bytes(build, count)
+        print(f"{name:>30}: {per_action:7.1f} B  ({time.perf_counter() - start:.1f} s)")
+    
+    # to_dict() builds one small dict per solution action; the nested
+    # params/result dicts are shared with the records, not copied
+    actions = build_slotted_records(1000)
+    problem = ProblemMemory("database is down", actions, True, 1700000000.0)
+    per_solution_action = traced_bytes(lambda _: problem.to_dict(), len(actions))
+    data = problem.to_dict()
+    shared = all(
+        entry["result"] is action.result and entry["action_params"] is action.action_params
+        for entry, action in zip(data["solution_actions"], actions)
+    )
+    print(f"ProblemMemory.to_dict(): {per_solution_action:.1f} B per solution action "
+          f"(params/result shared with the records: {shared})")
+
+
+if __name__ == "__main__":
+    main()
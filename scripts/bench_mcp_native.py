@@ -0,0 +1,61 @@
+"""
+MCP Terminal Server Native Command Benchmark
+
+Measures calls per second of the terminal MCP server's call_tool for
+simple commands answered by the in-process native handlers, next to the
+same commands executed as subprocesses (native handlers disabled).
+
+Requires the mcp package (see requirements.txt).
+
+Usage:
+    python scripts/bench_mcp_native.py [--native-calls 2000] [--exec-calls 200]
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "4-ai-agents" / "src"))
+
+import mcp_terminal_server as server  # noqa: E402
+
+COMMANDS = ["pwd", "echo hello world", "hostname", "whoami", "uname -sr", "uname -a", "date", "env"]
+
+
+async def calls_per_second(command: str, calls: int) -> float:
+    """Sequential call_tool rate for one command"""
+    arguments = {"command": command}
+    start = time.perf_counter()
+    for _ in range(calls):
+        await server.call_tool("execute_terminal_command", arguments)
+    return calls / (time.perf_counter() - start)
+
+
+async def run(native_calls: int, exec_calls: int):
+    server.COMMAND_CACHE_ENABLED = False
+    print(f"{'command':>18}  {'native calls/s':>15}  {'exec calls/s':>13}  {'speedup':>8}")
+    for command in COMMANDS:
+        server.NATIVE_COMMANDS_ENABLED = True
+        if server.run_native_command(command) is None:
+            print(f"{command:>18}  (no native handler for these arguments)")
+            continue
+        native = await calls_per_second(command, native_calls)
+        
+        server.NATIVE_COMMANDS_ENABLED = False
+        executed = await calls_per_second(command, exec_calls)
+        print(f"{command:>18}  {native:15.0f}  {executed:13.0f}  {native / executed:7.0f}x")
+    server.NATIVE_COMMANDS_ENABLED = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark native vs exec MCP terminal commands")
+    parser.add_argument("--native-calls", type=int, default=2000, help="Calls per command with native handlers")
+    parser.add_argument("--exec-calls", type=int, default=200, help="Calls per command through a subprocess")
+    args = parser.parse_args()
+    asyncio.run(run(args.native_calls, args.exec_calls))
+
+
+if __name__ == "__main__":
+    main()
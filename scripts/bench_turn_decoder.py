@@ -0,0 +1,140 @@
+"""
+Turn Stream Decoder Benchmark
+
+Measures the per-token cost of decoding an agent turn stream with
+TurnStreamDecoder, next to the previous decode loop (payloads converted
+to dictionaries on every chunk, text accumulated with +=).
+
+Chunks are built as pydantic models, like the ones llama_stack_client
+returns; without pydantic, small stand-in classes with a dict() method
+are used instead.
+
+Usage:
+    python scripts/bench_turn_decoder.py [--tokens 20000] [--repeat 5]
+"""
+
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "4-ai-agents" / "src"))
+
+from streaming import TurnStreamDecoder  # noqa: E402
+
+try:
+    from pydantic import BaseModel
+    
+    class Delta(BaseModel):
+        type: str = "text"
+        text: str = ""
+    
+    class Payload(BaseModel):
+        event_type: str
+        step_type: str = "inference"
+        step_id: str = "step-1"
+        turn_id: Optional[str] = None
+        delta: Optional[Delta] = None
+    
+    class Event(BaseModel):
+        payload: Payload
+    
+    class Chunk(BaseModel):
+        event: Event
+    
+    CHUNK_KIND = "pydantic models"
+except ImportError:
+    class _Model:
+        def __init__(self, **fields):
+            self.__dict__.update(fields)
+        
+        def dict(self):
+            return {
+                name: value.dict() if isinstance(value, _Model) else value
+                for name, value in self.__dict__.items()
+            }
+    
+    Delta = Payload = Event = Chunk = _Model
+    CHUNK_KIND = "stand-in objects (pydantic is not installed)"
+
+
+def build_stream(tokens: int) -> List[Any]:
+    """Build a turn stream with one text delta per token."""
+    chunks = [Chunk(event=Event(payload=Payload(event_type="turn_start", turn_id="turn-1")))]
+    for i in range(tokens):
+        chunks.append(Chunk(event=Event(payload=Payload(
+            event_type="step_progress",
+            delta=Delta(type="text", text=f"token{i} ")
+        ))))
+    chunks.append(Chunk(event=Event(payload=Payload(event_type="turn_complete", turn_id="turn-1"))))
+    return chunks
+
+
+def decode_incremental(chunks: List[Any]) -> str:
+    """Decode with TurnStreamDecoder, as the agents do."""
+    decoder = TurnStreamDecoder()
+    for chunk in chunks:
+        decoder.feed(chunk)
+        if decoder.is_complete:
+            break
+    return decoder.text
+
+
+def _to_dict(obj: Any) -> Optional[dict]:
+    if isinstance(obj, dict):
+        return obj
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    return None
+
+
+def decode_legacy(chunks: List[Any]) -> str:
+    """Decode the way the agent did before TurnStreamDecoder."""
+    result = ""
+    for chunk in chunks:
+        payload = _to_dict(chunk.event.payload)
+        if not payload:
+            continue
+        content = ""
+        delta = _to_dict(payload["delta"]) if payload.get("delta") else None
+        if delta:
+            if delta.get("content"):
+                content = str(delta["content"])
+            elif delta.get("text"):
+                content = str(delta["text"])
+        result += content
+        if payload.get("event_type") in ["turn_complete", "turn_end", "complete", "done"]:
+            break
+    return result
+
+
+def best_time(decode: Callable[[List[Any]], str], chunks: List[Any], repeat: int) -> float:
+    """Best wall-clock time of repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-token turn stream decoding")
+    parser.add_argument("--tokens", type=int, default=20000, help="Text deltas per turn")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per decoder (best is reported)")
+    args = parser.parse_args()
+    
+    chunks = build_stream(args.tokens)
+    assert decode_incremental(chunks) == decode_legacy(chunks)
+    
+    print(f"{args.tokens} tokens per turn, chunks are {CHUNK_KIND}")
+    for name, decode in (("TurnStreamDecoder", decode_incremental), ("legacy loop", decode_legacy)):
+        seconds = best_time(decode, chunks, args.repeat)
+        print(f"{name:>18}: {seconds * 1e6 / args.tokens:8.3f} us/token  ({seconds * 1e3:.1f} ms/turn)")
+
+
+if __name__ == "__main__":
+    main()